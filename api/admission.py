@@ -0,0 +1,189 @@
+"""
+Admission control between the API and Neo4j.
+
+Every database call belongs to a query class ("lookup" for the cheap reads and
+single writes, "matching" for demand matching, semantic search and bulk
+imports) and must hold one of that class's slots while it runs. A call that
+finds all slots busy waits in a bounded queue for up to the class's queue
+timeout; when the queue is full or the wait runs out it fails fast with
+``Overloaded`` (503 with Retry-After). Separate limits mean heavy matching
+traffic cannot take the sessions that profile lookups need.
+"""
+
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+# Connection methods that run expensive queries; everything else is a lookup
+MATCHING_METHODS = {"find_demand_matches", "semantic_search_profiles", "create_profiles"}
+
+# Connection methods that do not touch the database
+UNADMITTED_METHODS = {"close"}
+
+class Overloaded(HTTPException):
+    """No slot became free in time: answered with 503 and a Retry-After hint."""
+
+    def __init__(self, query_class, retry_after):
+        super().__init__(status_code=503, detail=f"Too many concurrent {query_class} queries, retry later",
+                         headers={"Retry-After": str(retry_after)})
+
+class AdmissionQueue:
+    """Concurrency limit for one query class, with a bounded queue of waiting calls."""
+
+    def __init__(self, name, limit, queue_size, queue_timeout):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def _acquire(self):
+        """
+        Wait up to the queue timeout for a slot; True once one is held. Before
+        Python 3.12, asyncio.wait_for could time out on an acquire that had just
+        succeeded and lose its permit, so the acquire runs as a task that hands
+        back any permit it gets after the caller stopped waiting.
+        """
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        try:
+            await asyncio.wait({acquire}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(acquire)
+            raise
+        if acquire.done() and not acquire.cancelled() and acquire.exception() is None:
+            return True
+        self._abandon(acquire)
+        return False
+
+    def _abandon(self, acquire):
+        acquire.cancel()
+        acquire.add_done_callback(
+            lambda task: task.cancelled() or task.exception() is not None or self._slots.release())
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the duration of the block, or raise ``Overloaded``."""
+        if self._slots.locked() and self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise Overloaded(self.name, self.retry_after)
+        self.waiting += 1
+        try:
+            acquired = await self._acquire()
+        finally:
+            self.waiting -= 1
+        if not acquired:
+            self.timed_out += 1
+            raise Overloaded(self.name, self.retry_after)
+        self.active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "queue_timeout_seconds": self.queue_timeout,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+class AdmittedStream:
+    """
+    Async iterator over the rows of a stream_* query that holds an admission
+    slot. The slot is released exactly once: when the rows run out or fail,
+    or on ``aclose()``, which works whether or not iteration ever started, so
+    a response that is never sent (client gone, error before the body) can
+    still give the slot back.
+    """
+
+    def __init__(self, slot, open_stream):
+        self._slot = slot
+        self._open_stream = open_stream
+        self._source = None
+        self._rows = None
+        self._released = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._released:
+            raise StopAsyncIteration
+        try:
+            if self._rows is None:
+                self._source = self._open_stream()
+                # Sync generators (threadpool mode) are advanced in worker threads
+                self._rows = (self._source if hasattr(self._source, "__aiter__")
+                              else iterate_in_threadpool(self._source))
+            return await self._rows.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        if self._released:
+            return
+        self._released = True
+        try:
+            if hasattr(self._source, "aclose"):
+                await self._source.aclose()
+            elif hasattr(self._source, "close"):
+                await run_in_threadpool(self._source.close)
+        finally:
+            await self._slot.__aexit__(None, None, None)
+
+class AdmissionControlledConnection:
+    """
+    Awaitable facade over a connection that runs every query inside a slot of
+    its class. stream_* methods become awaitable too: the slot is taken before
+    the response starts and held by the returned ``AdmittedStream`` until it
+    is exhausted or closed.
+    """
+
+    def __init__(self, connection, queues):
+        self.connection = connection
+        self.queues = queues
+
+    def _queue(self, name):
+        return self.queues["matching" if name in MATCHING_METHODS else "lookup"]
+
+    def __getattr__(self, name):
+        attr = getattr(self.connection, name)
+        if not callable(attr) or name in UNADMITTED_METHODS:
+            return attr
+        queue = self._queue(name)
+
+        if name.startswith("stream_"):
+            async def admitted_stream(*args, **kwargs):
+                slot = queue.slot()
+                await slot.__aenter__()
+                return AdmittedStream(slot, lambda: attr(*args, **kwargs))
+
+            return admitted_stream
+
+        async def admitted(*args, **kwargs):
+            async with queue.slot():
+                return await attr(*args, **kwargs)
+
+        return admitted
+
+    def stats(self):
+        return {name: queue.stats() for name, queue in self.queues.items()}
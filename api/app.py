@@ -3,16 +3,45 @@ FastAPI backend for the StaffAI job profile matching system.
 This API provides endpoints to search and retrieve profiles from the Neo4j database.
 """
 
-from fastapi import FastAPI, HTTPException, Query, Body
+from fastapi import FastAPI, HTTPException, Query, Body, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Dict, Any, Optional
 import sys
 import os
 from contextlib import asynccontextmanager
 import json
-from neo4j import GraphDatabase
-from config import NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+import time
+import asyncio
+
+# Cold-start clock: import of this module through to the app accepting requests
+IMPORT_STARTED = time.perf_counter()
+from database import create_connection, encode_cursor, decode_cursor, PROFILE_PROPERTIES, CONNECTION_ERRORS
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from starlette.background import BackgroundTask
+from cache import TTLCache
+import embeddings
+from metrics import metrics
+from versioning import DataVersion
+from snapshot import GraphSnapshot
+from breaker import CircuitBreaker
+from admission import AdmissionQueue, AdmissionControlledConnection, Overloaded
+from config import (MAX_BATCH_SIZE, MAX_PAGE_SIZE, SEARCH_RESULT_LIMIT, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES,
+                    DATA_VERSION_REFRESH_SECONDS, BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, SEMANTIC_MAX_K,
+                    DEMAND_MATCH_BUDGET_MS, DEMAND_MATCH_MAX_BUDGET_MS,
+                    NEO4J_CONNECT_RETRY_MAX_SECONDS, STARTUP_TARGET_MS, STORAGE_BACKEND,
+                    SNAPSHOT_ENABLED, SNAPSHOT_REFRESH_SECONDS, SNAPSHOT_SERVE_READS,
+                    ADMISSION_LOOKUP_LIMIT, ADMISSION_LOOKUP_QUEUE, ADMISSION_LOOKUP_QUEUE_TIMEOUT,
+                    ADMISSION_MATCHING_LIMIT, ADMISSION_MATCHING_QUEUE, ADMISSION_MATCHING_QUEUE_TIMEOUT)
+from src.descriptions import generate_demand_description
+
+try:
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+    import orjson  # noqa: F401  (ORJSONResponse only fails when rendering)
+except ImportError:
+    FastJSONResponse = JSONResponse
 
 # Models
 class ProfileBase(BaseModel):
@@ -42,213 +71,265 @@ class ProfileDetail(ProfileBase):
 class ProfileWithRating(ProfileBase):
     rating: int
 
-# Neo4j connection
-class Neo4jConnection:
-    def __init__(self, uri=NEO4J_URL, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password), database=database)
-        
-    def close(self):
-        self.driver.close()
-        
-    def test_connection(self):
-        with self.driver.session() as session:
-            result = session.run("RETURN 'Connection successful' as message")
-            return result.single()["message"]
-    
-    def get_all_profiles(self):
-        """Get all profiles from Neo4j."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Person)
-                RETURN p.emp_id as emp_id, 
-                       p.name as name, 
-                       p.role as role, 
-                       p.grade as grade, 
-                       p.office as office, 
-                       p.description as description
-            """)
-            return [dict(record) for record in result]
-            
-    def create_profile(self, profile_data):
-        """Create a new profile in Neo4j."""
-        # Generate a new unique ID
-        with self.driver.session() as session:
-            # Get the highest emp_id and increment
-            result = session.run("""
-                MATCH (p:Person)
-                RETURN p.emp_id as emp_id
-                ORDER BY p.emp_id DESC
-                LIMIT 1
-            """)
-            record = result.single()
-            if record:
-                try:
-                    last_id = int(record["emp_id"])
-                    new_id = str(last_id + 1).zfill(3)
-                except (ValueError, TypeError):
-                    new_id = "001"
-            else:
-                new_id = "001"
-                
-            # Create the profile
-            result = session.run("""
-                CREATE (p:Person {
-                    emp_id: $emp_id,
-                    name: $name,
-                    role: $role,
-                    grade: $grade,
-                    office: $office,
-                    description: $description,
-                    start_date: $start_date,
-                    end_date: $end_date
-                })
-                RETURN p.emp_id as emp_id, 
-                       p.name as name, 
-                       p.role as role, 
-                       p.grade as grade, 
-                       p.office as office, 
-                       p.description as description
-            """, 
-            emp_id=new_id,
-            name=f"Profile {new_id}",  # Default name
-            role=profile_data.role,
-            grade=profile_data.grade,
-            office=profile_data.office,
-            description=profile_data.job_description,
-            start_date=profile_data.start_date,
-            end_date=profile_data.end_date
-            )
-            
-            record = result.single()
-            if not record:
-                return None
-                
-            # Also create relationship to the Role node
-            session.run("""
-                MATCH (p:Person {emp_id: $emp_id})
-                MERGE (r:Role {name: $role})
-                CREATE (p)-[:CAN_PLAY]->(r)
-            """, emp_id=new_id, role=profile_data.role)
-                
-            return dict(record)
-    
-    def search_profiles(self, query):
-        """Search profiles by query."""
-        query_lower = query.lower()
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Person)
-                WHERE toLower(p.name) CONTAINS $query OR 
-                      toLower(p.role) CONTAINS $query OR 
-                      toLower(p.description) CONTAINS $query
-                RETURN p.emp_id as emp_id, 
-                       p.name as name, 
-                       p.role as role, 
-                       p.grade as grade, 
-                       p.office as office, 
-                       p.description as description
-            """, query=query_lower)
-            return [dict(record) for record in result]
-    
-    def get_profile_by_id(self, id):
-        """Get profile by ID with roles and skills."""
-        with self.driver.session() as session:
-            # Get basic profile info
-            profile_result = session.run("""
-                MATCH (p:Person {emp_id: $id})
-                RETURN p.emp_id as emp_id, 
-                       p.name as name, 
-                       p.role as role, 
-                       p.grade as grade, 
-                       p.office as office, 
-                       p.description as description
-            """, id=id)
-            
-            profile_record = profile_result.single()
-            if not profile_record:
-                return None
-            
-            profile = dict(profile_record)
-            
-            # Get roles
-            roles_result = session.run("""
-                MATCH (p:Person {emp_id: $id})-[:CAN_PLAY]->(r:Role)
-                RETURN r.name as role
-            """, id=id)
-            
-            profile["roles"] = [record["role"] for record in roles_result]
-            
-            # Get skills with ratings
-            skills_result = session.run("""
-                MATCH (p:P  erson {emp_id: $id})-[rel:HAS_SKILL]->(t:Tool)
-                RETURN t.name as name, rel.rating as rating
-            """, id=id)
-            
-            profile["skills"] = [{"name": record["name"], "rating": record["rating"]} for record in skills_result]
-            
-            return profile
-    
-    def get_all_roles(self):
-        """Get all roles."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (r:Role)
-                RETURN r.name as role
-                ORDER BY r.name
-            """)
-            return [record["role"] for record in result]
-    
-    def get_all_tools(self):
-        """Get all tools/skills."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (t:Tool)
-                RETURN t.name as tool
-                ORDER BY t.name
-            """)
-            return [record["tool"] for record in result]
-    
-    def get_profiles_by_role(self, role):
-        """Get profiles by role."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Person)-[:CAN_PLAY]->(r:Role {name: $role})
-                RETURN p.emp_id as emp_id, 
-                       p.name as name, 
-                       p.role as role, 
-                       p.grade as grade, 
-                       p.office as office, 
-                       p.description as description
-            """, role=role)
-            return [dict(record) for record in result]
-    
-    def get_profiles_by_tool(self, tool):
-        """Get profiles by tool/skill with ratings."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Person)-[rel:HAS_SKILL]->(t:Tool {name: $tool})
-                RETURN p.emp_id as emp_id, 
-                       p.name as name, 
-                       p.role as role, 
-                       p.grade as grade, 
-                       p.office as office, 
-                       p.description as description,
-                       rel.rating as rating
-                ORDER BY rel.rating DESC
-            """, tool=tool)
-            return [dict(record) for record in result]
-
-# Database connection
-try:
-    db = Neo4jConnection()
-    # Test connection
-    connection_test = db.test_connection()
-    print(f"Neo4j connection test: {connection_test}")
-except Exception as e:
-    print(f"Error connecting to Neo4j: {str(e)}")
-    # Continue with initialization to allow the app to start,
-    # but endpoints will fail if db connection is not working
-    db = None
+class BulkImportError(BaseModel):
+    row: int = Field(..., description="Zero-based position of the row in the request body")
+    error: str
+
+class BulkImportResult(BaseModel):
+    received: int
+    created: int
+    failed: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    emp_ids: List[str]
+    errors: List[BulkImportError]
+
+class ProfileSummary(BaseModel):
+    """Profile list item; only the properties requested with ``fields`` are set."""
+    emp_id: str
+    name: Optional[str] = None
+    role: Optional[str] = None
+    grade: Optional[str] = None
+    office: Optional[str] = None
+    description: Optional[str] = None
+
+class ProfileSummaryWithRating(ProfileSummary):
+    rating: int
+
+class ProfileWithScore(ProfileBase):
+    score: float
+
+class VectorSearchRequest(BaseModel):
+    query: str = Field(..., description="Free-text description of the profile wanted")
+    limit: int = Field(10, ge=1, le=SEMANTIC_MAX_K, description="Number of profiles to return")
+
+class DemandCreate(BaseModel):
+    role: str = Field(..., description="Required role")
+    grade: str = Field(..., description="Required grade level")
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    office: str = Field(..., description="Office location")
+    job_description: str = Field(..., description="Job description")
+
+class Demand(DemandCreate):
+    id: str
+    description: Optional[str] = None
+
+class DemandMatch(BaseModel):
+    emp_id: str
+    name: str
+    role: str
+    grade: str
+    similarity: float
+    hops: int = Field(..., description="1 if the person can play the required role, 2 if similar to someone who can")
+
+class ProfileBatchRequest(BaseModel):
+    emp_ids: List[str] = Field(..., description="Employee IDs to fetch", max_length=MAX_BATCH_SIZE)
+
+class PageParams:
+    """Keyset pagination and field projection parameters for list endpoints."""
+
+    def __init__(self,
+                 limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE,
+                                              description="Page size; omit to return every match"),
+                 cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+                 fields: Optional[str] = Query(None, description="Comma-separated profile properties to return")):
+        self.limit = limit
+        try:
+            self.after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        self.fields = None
+        if fields:
+            self.fields = {field.strip() for field in fields.split(",") if field.strip()}
+            unknown = self.fields - set(PROFILE_PROPERTIES)
+            if unknown:
+                raise HTTPException(status_code=400,
+                                    detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    @property
+    def cache_key(self):
+        return (self.limit,
+                tuple(self.after) if self.after else None,
+                tuple(sorted(self.fields)) if self.fields else None)
+
+    def set_next_cursor(self, response: Response, rows, *keys):
+        """Point the client at the next page when this one came back full."""
+        if self.limit is not None and len(rows) == self.limit:
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(*(last[key] for key in keys))
+
+# Database connection, set by the lifespan once Neo4j answers. Until then
+# endpoints serve their fallbacks or answer 503, and /api/ready reports not ready.
+db = None
+
+# Retry-After hint for requests that need Neo4j before it is connected
+DATABASE_RETRY_AFTER_SECONDS = 5
+
+class DatabaseUnavailable(HTTPException):
+    """Neo4j is not connected (yet): answered with 503 and a Retry-After hint."""
+
+    def __init__(self):
+        super().__init__(status_code=503, detail="Database not available yet, retry later",
+                         headers={"Retry-After": str(DATABASE_RETRY_AFTER_SECONDS)})
+
+# Opens when Neo4j stops answering, so requests stop waiting on it (see breaker.py)
+breaker = CircuitBreaker(CONNECTION_ERRORS)
+metrics.gauge("staffai_db_breaker_open", "1 while Neo4j is marked unreachable.", lambda: int(breaker.open))
+
+def require_db():
+    if db is None or breaker.open:
+        raise DatabaseUnavailable()
+
+# Per query class limits on concurrent Neo4j queries (see admission.py)
+admission_queues = {
+    "lookup": AdmissionQueue("lookup", ADMISSION_LOOKUP_LIMIT, ADMISSION_LOOKUP_QUEUE,
+                             ADMISSION_LOOKUP_QUEUE_TIMEOUT),
+    "matching": AdmissionQueue("matching", ADMISSION_MATCHING_LIMIT, ADMISSION_MATCHING_QUEUE,
+                               ADMISSION_MATCHING_QUEUE_TIMEOUT),
+}
+for queue in admission_queues.values():
+    metrics.gauge(f"staffai_admission_{queue.name}_active", f"Running {queue.name} queries.",
+                  lambda queue=queue: queue.active)
+    metrics.gauge(f"staffai_admission_{queue.name}_waiting", f"{queue.name.capitalize()} queries queued for a slot.",
+                  lambda queue=queue: queue.waiting)
+
+# Startup progress, reported by /api/ready
+startup = {"startup_ms": None, "connected_ms": None, "connect_attempts": 0, "last_error": None}
+
+# Cache for read-mostly query results; write paths invalidate what they change
+cache = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+# Last graph data version seen, used for ETag / conditional GET
+data_version = DataVersion()
+
+# In-memory copy of profiles, roles and tools for when Neo4j is down
+snapshot = GraphSnapshot()
+
+# GET endpoints whose responses depend only on the graph data version
+CONDITIONAL_GET_PREFIXES = ("/api/profiles", "/api/roles", "/api/tools")
+
+async def sync_data_version():
+    """
+    Read the graph data version; drop cached results if the graph changed.
+    Doubles as the breaker's probe: it keeps querying Neo4j while reads don't.
+    """
+    try:
+        record = await db.get_data_version()
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    if data_version.update(record["version"], record["updated_at"]):
+        cache.invalidate()
+
+def record_write(version, updated_at, *namespaces):
+    """
+    Note the data version returned by one of our writes and drop the cached
+    ``namespaces`` it changed. If the version moved by more than one, another
+    process wrote in between and the poller will not see a change, so
+    everything cached is dropped instead.
+    """
+    previous = data_version.version
+    if data_version.update(version, updated_at) and (previous is None or version - previous > 1):
+        cache.invalidate()
+    else:
+        cache.invalidate(*namespaces)
+
+async def poll_data_version():
+    """Keep the data version current so writes from other processes are noticed."""
+    while True:
+        await asyncio.sleep(DATA_VERSION_REFRESH_SECONDS)
+        try:
+            await sync_data_version()
+        except Exception as e:
+            print(f"Error refreshing data version: {str(e)}")
+
+async def refresh_snapshot():
+    """Reload the snapshot if the graph has moved past the version it holds."""
+    record = await db.get_data_version()
+    version = record["version"] or 0
+    if snapshot.confirm(version):
+        return
+    profiles, roles, tools = await asyncio.gather(
+        db.get_snapshot_profiles(), db.get_all_roles(), db.get_all_tools())
+    snapshot.load(profiles, roles, tools, version)
+    print(f"Loaded snapshot of {len(profiles)} profiles at data version {version}")
+
+async def poll_snapshot():
+    """Keep the snapshot current; it is first loaded as soon as Neo4j is connected."""
+    while True:
+        if db is not None and not breaker.open:
+            try:
+                await refresh_snapshot()
+            except Exception as e:
+                print(f"Error refreshing snapshot: {str(e)}")
+        await asyncio.sleep(SNAPSHOT_REFRESH_SECONDS if snapshot.loaded else 1)
+
+def serve_from_snapshot():
+    """Reads skip Neo4j while it is unavailable, or always with SNAPSHOT_SERVE_READS."""
+    return snapshot.loaded and (db is None or breaker.open or SNAPSHOT_SERVE_READS)
+
+def snapshot_headers():
+    return {"X-Data-Source": "snapshot", "X-Snapshot-Age": f"{snapshot.age:.0f}"}
+
+async def read_with_snapshot(response: Response, load, from_snapshot):
+    """
+    Return ``await load()``, or ``from_snapshot()`` when reads are served from
+    the snapshot or Neo4j fails. Snapshot results mark ``response`` with their
+    staleness; without a snapshot, errors propagate.
+    """
+    if not serve_from_snapshot():
+        require_db()
+        try:
+            return await load()
+        except Exception as e:
+            breaker.record_failure(e)
+            if not snapshot.loaded:
+                raise
+    response.headers.update(snapshot_headers())
+    return from_snapshot()
+
+def fast_json(content, response: Response = None):
+    """
+    Serialize trusted query results straight to JSON, skipping the
+    response_model validation FastAPI would otherwise run on every item.
+    The route's response_model is kept for the OpenAPI docs only. Headers
+    already set on the injected ``response`` are carried over.
+    """
+    fast_response = FastJSONResponse(content)
+    if response is not None:
+        fast_response.headers.raw.extend(response.headers.raw)
+    return fast_response
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request):
+    """Clients opt into streaming with ``Accept: application/x-ndjson``."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def ndjson_response(rows, headers=None):
+    """
+    Stream rows from a stream_* query as NDJSON, one line per record, so
+    memory stays flat and the first bytes go out before the query finishes.
+    Sync generators (threadpool mode) and lists are iterated in the thread pool by Starlette.
+    Admitted streams are also closed by a background task, which Starlette runs
+    even if the body was never iterated, so their slot cannot leak.
+    """
+    if hasattr(rows, "__aiter__"):
+        async def lines():
+            try:
+                async for row in rows:
+                    yield json.dumps(row) + "\n"
+            finally:
+                await rows.aclose()
+    else:
+        def lines():
+            for row in rows:
+                yield json.dumps(row) + "\n"
+    background = BackgroundTask(rows.aclose) if hasattr(rows, "aclose") else None
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers, background=background)
 
 # Create sample data for testing
 SAMPLE_PROFILES = [
@@ -278,16 +359,88 @@ SAMPLE_PROFILES = [
     }
 ]
 
+def sample_response(rows):
+    """
+    Placeholder profiles for when neither Neo4j nor the snapshot can answer.
+    Marked ``X-Data-Source: sample`` so conditional_get never tags them with
+    the graph's ETag.
+    """
+    response = fast_json(rows)
+    response.headers["X-Data-Source"] = "sample"
+    return response
+
+def search_sample_profiles(query):
+    query_lower = query.lower()
+    return sample_response([
+        profile for profile in SAMPLE_PROFILES
+        if query_lower in profile["name"].lower()
+        or query_lower in profile["role"].lower()
+        or (profile.get("description") and query_lower in profile["description"].lower())
+    ])
+
 SAMPLE_ROLES = ["Data Scientist", "Software Engineer", "Data Analyst", "Frontend Developer", "Backend Developer"]
 SAMPLE_TOOLS = ["Python", "R", "Java", "SQL", "Excel", "TensorFlow", "React", "Node.js"]
 
+async def open_connection():
+    """Connect to Neo4j and prepare the graph; raises if it is not reachable."""
+    connection = create_connection()
+    try:
+        if STORAGE_BACKEND == "memory":
+            await connection.load_sample_data(embeddings.embed_texts)
+        connection_test = await connection.test_connection()
+        print(f"Neo4j connection test: {connection_test}")
+        for sequence in ("emp_id", "demand_id"):
+            await connection.sync_id_sequence(sequence)
+        record = await connection.get_data_version()
+        data_version.update(record["version"], record["updated_at"])
+    except Exception:
+        await connection.close()
+        raise
+    return connection
+
+async def connect_with_retry():
+    """Keep trying to connect, backing off exponentially, then start the version poller."""
+    global db
+    delay = 1.0
+    while True:
+        startup["connect_attempts"] += 1
+        try:
+            connection = await open_connection()
+            break
+        except Exception as e:
+            startup["last_error"] = str(e)
+            print(f"Error connecting to Neo4j (attempt {startup['connect_attempts']}, "
+                  f"retrying in {delay:.0f}s): {str(e)}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, NEO4J_CONNECT_RETRY_MAX_SECONDS)
+    db = AdmissionControlledConnection(connection, admission_queues)
+    startup["connected_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
+    startup["last_error"] = None
+    await poll_data_version()
+
 # Lifespan event handler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: never wait for Neo4j, so a slow or down database cannot stall
+    # worker boot or --reload
+    global db
+    connector = asyncio.create_task(connect_with_retry())
+    snapshot_poller = asyncio.create_task(poll_snapshot()) if SNAPSHOT_ENABLED else None
+    startup["startup_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
+    print(f"API started in {startup['startup_ms']:.0f} ms (target {STARTUP_TARGET_MS:.0f} ms)")
     yield
     # Shutdown
-    db.close()
+    for task in (connector, snapshot_poller):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if db is not None:
+        await db.close()
+        db = None
 
 # Create FastAPI app
 app = FastAPI(
@@ -304,117 +457,421 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "X-Data-Source", "X-Snapshot-Age"],
 )
 
-@app.get("/api/profiles", response_model=List[ProfileBase])
-async def get_profiles():
-    """Get all profiles."""
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    Answer unchanged reads with 304 Not Modified, without touching Neo4j,
+    and tag fresh responses with the graph data version.
+    """
+    if request.method != "GET" or not request.url.path.startswith(CONDITIONAL_GET_PREFIXES) \
+            or not data_version.known:
+        return await call_next(request)
+    # Capture the headers first so a version bump mid-request cannot label older data as newer
+    representation = "ndjson" if wants_ndjson(request) else None
+    version, headers = data_version.version, data_version.headers(representation)
+    if data_version.is_not_modified(request.headers, representation):
+        return Response(status_code=304, headers={**headers, "Vary": "Accept"})
+    response = await call_next(request)
+    # JSON and NDJSON share URLs, so caches must key on Accept as well
+    response.headers.add_vary_header("Accept")
+    # Sample fallbacks, and a snapshot that lags the graph, must not be cached under the graph's version
+    source = response.headers.get("X-Data-Source")
+    untagged = source == "sample" or (source == "snapshot" and not snapshot.is_current(version))
+    if response.status_code == 200 and not untagged:
+        response.headers.update(headers)
+    return response
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Time every request by route template (for streams: until the headers are sent)."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    metrics.observe_request(request.method, route_template(request),
+                            response.status_code, time.perf_counter() - started)
+    return response
+
+def route_template(request: Request):
+    """
+    The path template of the route that served ``request``. Requests answered
+    by middleware (conditional_get's 304s) never reach the router, so their
+    route is looked up the way the router would have matched it.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        for candidate in app.router.routes:
+            match, _ = candidate.matches(request.scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return route.path if route else "unmatched"
+
+@app.get("/api/profiles", response_model=List[ProfileSummary], response_model_exclude_unset=True)
+async def get_profiles(request: Request, response: Response, page: PageParams = Depends()):
+    """
+    Get all profiles, optionally one keyset page at a time.
+    Send ``Accept: application/x-ndjson`` to stream them instead.
+    """
     try:
-        if db is not None:
-            return db.get_all_profiles()
+        if serve_from_snapshot() and wants_ndjson(request):
+            return ndjson_response(snapshot.all_profiles(page.limit, page.after, page.fields), snapshot_headers())
+        if db is not None or snapshot.loaded:
+            if wants_ndjson(request):
+                require_db()
+                return ndjson_response(await db.stream_all_profiles(page.limit, page.after, page.fields))
+            profiles = await read_with_snapshot(
+                response,
+                lambda: cache.get_or_load(("profiles", page.cache_key),
+                                          lambda: db.get_all_profiles(page.limit, page.after, page.fields)),
+                lambda: snapshot.all_profiles(page.limit, page.after, page.fields))
+            page.set_next_cursor(response, profiles, "emp_id")
+            return fast_json(profiles, response)
         else:
             # Fallback to sample data if database connection failed
             print("Using sample data as fallback since database connection failed")
-            return SAMPLE_PROFILES
+            return sample_response(SAMPLE_PROFILES)
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         print(f"Error in get_profiles: {str(e)}")
         # Fallback to sample data
-        return SAMPLE_PROFILES
+        return sample_response(SAMPLE_PROFILES)
 
 @app.get("/api/profiles/search", response_model=List[ProfileBase])
-async def search_profiles(query: str = Query(..., description="Search query")):
-    """Search profiles by query."""
-    if not query:
+async def search_profiles(response: Response,
+                          query: str = Query(..., description="Search query"),
+                          limit: int = Query(SEARCH_RESULT_LIMIT, ge=1, le=MAX_PAGE_SIZE,
+                                             description="Maximum number of results")):
+    """Search profiles by query, most relevant first."""
+    if not query.strip():
         raise HTTPException(status_code=400, detail="Search query is required")
     
     try:
-        if db is not None:
-            return db.search_profiles(query)
+        if db is not None or snapshot.loaded:
+            return fast_json(await read_with_snapshot(response, lambda: db.search_profiles(query, limit),
+                                                      lambda: snapshot.search(query, limit)), response)
         else:
             # Fallback to filtering sample data
             print("Using sample data as fallback since database connection failed")
-            query_lower = query.lower()
-            return [
-                profile for profile in SAMPLE_PROFILES 
-                if query_lower in profile["name"].lower() 
-                or query_lower in profile["role"].lower() 
-                or (profile.get("description") and query_lower in profile["description"].lower())
-            ]
+            return search_sample_profiles(query)
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         print(f"Error in search_profiles: {str(e)}")
         # Fallback to filtering sample data
-        query_lower = query.lower()
-        return [
-            profile for profile in SAMPLE_PROFILES 
-            if query_lower in profile["name"].lower() 
-            or query_lower in profile["role"].lower() 
-            or (profile.get("description") and query_lower in profile["description"].lower())
-        ]
+        return search_sample_profiles(query)
+
+async def semantic_search(q: str, k: int):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is required")
+    require_db()
+    try:
+        # Encoding is CPU-bound, keep it off the event loop
+        embedding = await run_in_threadpool(embeddings.embed_query, q)
+        return fast_json(await db.semantic_search_profiles(embedding, k))
+    except (Overloaded, DatabaseUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/profiles/semantic", response_model=List[ProfileWithScore])
+async def semantic_search_profiles(q: str = Query(..., description="Free-text description of the profile wanted"),
+                                   k: int = Query(10, ge=1, le=SEMANTIC_MAX_K,
+                                                  description="Number of profiles to return")):
+    """Find the k profiles whose embeddings are nearest to the query, most similar first."""
+    return await semantic_search(q, k)
+
+@app.post("/api/profiles/vector-search", response_model=List[ProfileWithScore])
+async def vector_search_profiles(search: VectorSearchRequest = Body(...)):
+    """Semantic search in the request shape used by the frontend."""
+    return await semantic_search(search.query, search.limit)
 
 @app.get("/api/profiles/{id}", response_model=ProfileDetail)
-async def get_profile(id: str):
+async def get_profile(id: str, response: Response):
     """Get profile by ID with roles and skills."""
     try:
-        profile = db.get_profile_by_id(id)
+        profile = await read_with_snapshot(
+            response,
+            lambda: cache.get_or_load(("profile_detail", id), lambda: db.get_profile_by_id(id)),
+            lambda: snapshot.profile_by_id(id))
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
         return profile
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         if "Profile not found" in str(e):
             raise HTTPException(status_code=404, detail="Profile not found")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@app.post("/api/profiles/batch", response_model=List[ProfileDetail])
+async def get_profiles_batch(response: Response, batch: ProfileBatchRequest = Body(...)):
+    """Get several profiles with roles and skills in one round trip.
+
+    Profiles are returned in request order; unknown IDs are skipped.
+    """
+    # Drop duplicate IDs but keep the order the client asked for
+    emp_ids = list(dict.fromkeys(batch.emp_ids))
+    try:
+        return fast_json(await read_with_snapshot(response, lambda: db.get_profiles_by_ids(emp_ids),
+                                                  lambda: snapshot.profiles_by_ids(emp_ids)), response)
+    except (Overloaded, DatabaseUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
 @app.get("/api/roles", response_model=List[str])
-async def get_roles():
+async def get_roles(response: Response):
     """Get all roles."""
     try:
-        return db.get_all_roles()
+        return fast_json(await read_with_snapshot(response, lambda: cache.get_or_load(("roles",), db.get_all_roles),
+                                                  lambda: snapshot.roles), response)
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.get("/api/tools", response_model=List[str])
-async def get_tools():
+async def get_tools(response: Response):
     """Get all tools/skills."""
     try:
-        return db.get_all_tools()
+        return fast_json(await read_with_snapshot(response, lambda: cache.get_or_load(("tools",), db.get_all_tools),
+                                                  lambda: snapshot.tools), response)
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@app.get("/api/profiles/role/{role}", response_model=List[ProfileBase])
-async def get_profiles_by_role(role: str):
-    """Get profiles by role."""
+@app.get("/api/profiles/role/{role}", response_model=List[ProfileSummary], response_model_exclude_unset=True)
+async def get_profiles_by_role(role: str, request: Request, response: Response, page: PageParams = Depends()):
+    """
+    Get profiles by role, optionally one keyset page at a time.
+    Send ``Accept: application/x-ndjson`` to stream them instead.
+    """
     try:
-        return db.get_profiles_by_role(role)
+        if wants_ndjson(request):
+            if serve_from_snapshot():
+                return ndjson_response(snapshot.profiles_by_role(role, page.limit, page.after, page.fields),
+                                       snapshot_headers())
+            require_db()
+            return ndjson_response(await db.stream_profiles_by_role(role, page.limit, page.after, page.fields))
+        profiles = await read_with_snapshot(
+            response,
+            lambda: cache.get_or_load(("profiles_by_role", role, page.cache_key),
+                                      lambda: db.get_profiles_by_role(role, page.limit, page.after, page.fields)),
+            lambda: snapshot.profiles_by_role(role, page.limit, page.after, page.fields))
+        page.set_next_cursor(response, profiles, "emp_id")
+        return fast_json(profiles, response)
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@app.get("/api/profiles/tool/{tool}", response_model=List[ProfileWithRating])
-async def get_profiles_by_tool(tool: str):
-    """Get profiles by tool/skill."""
+@app.get("/api/profiles/tool/{tool}", response_model=List[ProfileSummaryWithRating], response_model_exclude_unset=True)
+async def get_profiles_by_tool(tool: str, request: Request, response: Response, page: PageParams = Depends()):
+    """
+    Get profiles by tool/skill, best rated first, optionally one keyset page at a time.
+    Send ``Accept: application/x-ndjson`` to stream them instead.
+    """
+    if page.after is not None and len(page.after) != 2:
+        raise HTTPException(status_code=400, detail="Invalid cursor for a tool listing")
     try:
-        return db.get_profiles_by_tool(tool)
+        if wants_ndjson(request):
+            if serve_from_snapshot():
+                return ndjson_response(snapshot.profiles_by_tool(tool, page.limit, page.after, page.fields),
+                                       snapshot_headers())
+            require_db()
+            return ndjson_response(await db.stream_profiles_by_tool(tool, page.limit, page.after, page.fields))
+        profiles = await read_with_snapshot(
+            response,
+            lambda: cache.get_or_load(("profiles_by_tool", tool, page.cache_key),
+                                      lambda: db.get_profiles_by_tool(tool, page.limit, page.after, page.fields)),
+            lambda: snapshot.profiles_by_tool(tool, page.limit, page.after, page.fields))
+        page.set_next_cursor(response, profiles, "rating", "emp_id")
+        return fast_json(profiles, response)
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness: the process is up, whether or not Neo4j is reachable."""
     return {"status": "ok"}
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness: 200 once connected to Neo4j, 503 while still connecting."""
+    body = {"status": "ready" if db is not None else "starting", **startup, "breaker": breaker.stats()}
+    return JSONResponse(body, status_code=200 if db is not None else 503)
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Query and request latency metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/admission/stats")
+async def admission_stats():
+    """Slots, queue depth and rejections per query class."""
+    return {name: queue.stats() for name, queue in admission_queues.items()}
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Cache hit/miss counters for tuning CACHE_TTL_SECONDS and CACHE_MAX_ENTRIES."""
+    return {**cache.stats(), "query_embeddings": embeddings.cache_info(), "snapshot": snapshot.stats()}
+
 @app.post("/api/profiles", response_model=ProfileBase)
 async def create_profile(profile_data: ProfileCreate = Body(...)):
     """Create a new profile."""
+    require_db()
     try:
-        if db is not None:
-            profile = db.create_profile(profile_data)
-            if not profile:
-                raise HTTPException(status_code=500, detail="Failed to create profile")
-            return profile
-        else:
-            # Fallback for testing without DB
-            raise HTTPException(status_code=500, detail="Database connection not available")
+        profile = await db.create_profile(profile_data)
+        if not profile:
+            raise HTTPException(status_code=500, detail="Failed to create profile")
+        # The new Person shows up in listings and may have MERGEd a new Role
+        record_write(profile.pop("data_version"), profile.pop("data_updated_at"),
+                     "profiles", "profiles_by_role", "roles")
+        return profile
+    except (Overloaded, DatabaseUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/demands", response_model=Demand)
+async def create_demand(demand: DemandCreate = Body(...)):
+    """Create a demand with an embedding of its description."""
+    require_db()
+    fields = demand.model_dump()
+    description = generate_demand_description(fields)
+    try:
+        # Encoding is CPU-bound, keep it off the event loop
+        embedding = await run_in_threadpool(embeddings.embed_text, description)
+        return await db.create_demand(fields, description, embedding)
+    except (Overloaded, DatabaseUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/demands/{id}/matches", response_model=List[DemandMatch])
+async def get_demand_matches(id: str,
+                             k: int = Query(10, ge=1, le=SEMANTIC_MAX_K, description="Number of matches to return"),
+                             hops: int = Query(1, ge=1, le=2,
+                                               description="1: people who can play the role, 2: also people similar to them"),
+                             threshold: float = Query(0.5, ge=-1, le=1, description="Minimum demand/person similarity"),
+                             budget_ms: int = Query(DEMAND_MATCH_BUDGET_MS, ge=1, le=DEMAND_MATCH_MAX_BUDGET_MS,
+                                                    description="Time budget for the matching queries")):
+    """Get the k people who best match a demand, most similar first."""
+    require_db()
+    budget = budget_ms / 1000
+
+    async def match():
+        # Both hop queries run concurrently; each is aborted server-side when the budget runs out
+        results = await asyncio.gather(*(db.find_demand_matches(id, hop, k, threshold, timeout=budget)
+                                         for hop in range(1, hops + 1)))
+        best = {}
+        for hop, rows in enumerate(results, start=1):
+            for row in rows:
+                if row["emp_id"] not in best or row["similarity"] > best[row["emp_id"]]["similarity"]:
+                    best[row["emp_id"]] = {**row, "hops": hop}
+        return sorted(best.values(), key=lambda row: row["similarity"], reverse=True)[:k]
+
+    try:
+        matches = await asyncio.wait_for(match(), timeout=budget)
+        # No matches: tell an unknown demand apart from one nobody matches
+        found = bool(matches) or await db.get_demand(id) is not None
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Matching exceeded its {budget_ms} ms budget")
+    except (Overloaded, DatabaseUnavailable):
+        raise
     except Exception as e:
+        if "TimedOut" in (getattr(e, "code", None) or ""):
+            raise HTTPException(status_code=504, detail=f"Matching exceeded its {budget_ms} ms budget")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not found:
+        raise HTTPException(status_code=404, detail="Demand not found")
+    return fast_json(matches)
+
+def parse_bulk_rows(body: bytes, content_type: str):
+    """
+    Split a bulk import body into raw rows. NDJSON bodies yield one row per
+    non-blank line, with a ValueError in place of any line that is not JSON;
+    anything else must be a JSON array.
+    """
+    if content_type.startswith("application/x-ndjson"):
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+        return rows
+    try:
+        rows = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of profiles or an NDJSON body")
+    return rows
+
+def validation_summary(error: ValidationError) -> str:
+    """One ``field: message`` entry per problem, without echoing the input back."""
+    return "; ".join(f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+                     for detail in error.errors())
+
+@app.post("/api/profiles/bulk", response_model=BulkImportResult)
+async def create_profiles_bulk(request: Request,
+                               batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE,
+                                                       description="Profiles written per transaction")):
+    """
+    Create many profiles from a JSON array or NDJSON body of ProfileCreate rows.
+
+    Rows are written in UNWIND batches, one transaction per batch. Invalid rows
+    and rows of failed batches are reported in ``errors`` without stopping the import.
+    """
+    require_db()
+    started = time.perf_counter()
+    raw_rows = parse_bulk_rows(await request.body(), request.headers.get("content-type", ""))
+
+    rows, errors = [], []
+    for index, raw in enumerate(raw_rows):
+        if isinstance(raw, ValueError):
+            errors.append(BulkImportError(row=index, error=f"Invalid JSON: {str(raw)}"))
+            continue
+        try:
+            rows.append((index, ProfileCreate.model_validate(raw).model_dump()))
+        except ValidationError as e:
+            errors.append(BulkImportError(row=index, error=validation_summary(e)))
+
+    emp_ids, batches = [], 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        batches += 1
+        try:
+            result = await db.create_profiles([row for _, row in batch])
+        except HTTPException:
+            # Overloaded or DatabaseUnavailable: the client should retry, not read row errors
+            raise
+        except Exception as e:
+            errors.extend(BulkImportError(row=index, error=f"Batch failed: {str(e)}") for index, _ in batch)
+            continue
+        emp_ids.extend(result["emp_ids"])
+        record_write(result["data_version"], result["data_updated_at"], "profiles", "profiles_by_role", "roles")
+
+    elapsed = time.perf_counter() - started
+    return BulkImportResult(
+        received=len(raw_rows),
+        created=len(emp_ids),
+        failed=len(errors),
+        batches=batches,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(len(emp_ids) / elapsed, 1) if elapsed > 0 else 0.0,
+        emp_ids=emp_ids,
+        errors=sorted(errors, key=lambda error: error.row),
+    )
 
 if __name__ == "__main__":
     import uvicorn
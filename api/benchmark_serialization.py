@@ -0,0 +1,77 @@
+"""
+Benchmark the cost of serializing profile list responses.
+
+Compares the default FastAPI path (validate every row against the route's
+response_model, then render with the stdlib json module) with the fast path
+used by the list endpoints (render the query results directly with
+FastJSONResponse). Run from the api directory:
+
+    python benchmark_serialization.py [--profiles 10000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import time
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app import app, FastJSONResponse
+
+def make_profiles(count):
+    """Synthetic rows shaped like the profile list Cypher projection."""
+    return [
+        {
+            "emp_id": str(i).zfill(6),
+            "name": f"Profile {i}",
+            "role": "Software Engineer",
+            "grade": "Senior",
+            "office": "London",
+            "description": "Can play roles: Software Engineer, Backend Developer. "
+                           "Skilled in Python (rating: 5), SQL (rating: 4), Java (rating: 3). "
+                           "Senior level position in London.",
+        }
+        for i in range(count)
+    ]
+
+def get_route(path):
+    return next(route for route in app.routes if getattr(route, "path", None) == path)
+
+async def fastapi_path(route, rows):
+    """What FastAPI does for a route that returns plain data."""
+    content = await serialize_response(field=route.response_field, response_content=rows,
+                                       exclude_unset=route.response_model_exclude_unset)
+    return JSONResponse(content).body
+
+async def fast_path(route, rows):
+    """What the list endpoints do now: render the query results directly."""
+    return FastJSONResponse(rows).body
+
+def run(label, serializer, rows, repeat):
+    """Time ``serializer`` and print the best and median cost per 10k profiles."""
+    route = get_route("/api/profiles")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = asyncio.run(serializer(route, rows))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    scale = 10000 / len(rows) * 1000
+    print(f"{label:<32} best {timings[0] * scale:8.1f} ms   median {timings[len(timings) // 2] * scale:8.1f} ms"
+          f"   per 10k profiles ({len(body) / 1024:.0f} KiB)")
+    return timings[len(timings) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=10000, help="Number of profiles per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per serializer")
+    args = parser.parse_args()
+
+    rows = make_profiles(args.profiles)
+    print(f"Serializing {args.profiles} profiles, {args.repeat} runs each "
+          f"(fast path uses {FastJSONResponse.__name__})\n")
+    before = run("response_model + JSONResponse", fastapi_path, rows, args.repeat)
+    after = run("fast_json", fast_path, rows, args.repeat)
+    print(f"\nSpeed-up: {before / after:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measure API cold start against STARTUP_TARGET_MS.
+
+Each run starts a fresh interpreter, imports the app and runs its lifespan
+startup, i.e. everything a worker does before it accepts requests (connecting
+to Neo4j happens in the background and is not included). Run from the api
+directory; exits non-zero if the median exceeds the target:
+
+    python benchmark_startup.py [--repeat 5] [--target-ms 2000]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from config import STARTUP_TARGET_MS
+
+CHILD = """
+import asyncio, time
+started = time.perf_counter()
+import app
+
+async def boot():
+    async with app.app.router.lifespan_context(app.app):
+        return (time.perf_counter() - started) * 1000
+
+print(asyncio.run(boot()))
+"""
+
+def measure():
+    """Wall time of the whole process and time from import to ready, in ms."""
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True).stdout
+    wall_ms = (time.perf_counter() - started) * 1000
+    return wall_ms, float(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts to time")
+    parser.add_argument("--target-ms", type=float, default=STARTUP_TARGET_MS, help="Target for import to ready")
+    args = parser.parse_args()
+
+    runs = sorted((measure() for _ in range(args.repeat)), key=lambda run: run[1])
+    for wall_ms, ready_ms in runs:
+        print(f"import to ready {ready_ms:8.1f} ms   process {wall_ms:8.1f} ms")
+    median = runs[len(runs) // 2][1]
+    verdict = "OK" if median <= args.target_ms else "OVER TARGET"
+    print(f"\nMedian import to ready: {median:.1f} ms (target {args.target_ms:.0f} ms) {verdict}")
+    sys.exit(0 if median <= args.target_ms else 1)
+
+if __name__ == "__main__":
+    main()
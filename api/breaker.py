@@ -0,0 +1,44 @@
+"""
+Circuit breaker in front of Neo4j.
+
+A read that fails with a connection error has already waited out the driver's
+retries (up to NEO4J_MAX_TRANSACTION_RETRY_TIME). Once that happens the breaker
+opens: reads go straight to the snapshot, and anything else that needs Neo4j
+answers 503, instead of every request waiting out the same retries while
+holding an admission slot. The data version poller keeps querying Neo4j in the
+background; its first successful read closes the breaker again.
+"""
+
+import time
+
+class CircuitBreaker:
+    """Open while Neo4j is known to be unreachable."""
+
+    def __init__(self, errors, clock=time.time):
+        self.errors = errors
+        self.clock = clock
+        self.opened_at = None
+        self.trips = 0
+
+    @property
+    def open(self):
+        return self.opened_at is not None
+
+    def record_failure(self, error):
+        """Open the breaker if ``error`` means Neo4j cannot be reached."""
+        if isinstance(error, self.errors) and not self.open:
+            self.opened_at = self.clock()
+            self.trips += 1
+            print(f"Neo4j unreachable, serving reads from the snapshot: {str(error)}")
+
+    def record_success(self):
+        if self.open:
+            print(f"Neo4j reachable again after {self.clock() - self.opened_at:.0f}s")
+            self.opened_at = None
+
+    def stats(self):
+        return {
+            "open": self.open,
+            "open_seconds": round(self.clock() - self.opened_at, 1) if self.open else None,
+            "trips": self.trips,
+        }
@@ -0,0 +1,95 @@
+"""
+In-process cache for read-mostly query results.
+
+Entries are keyed by tuples whose first element is a namespace (e.g. "roles"),
+so write paths can invalidate everything a write may have changed without
+knowing the exact keys. Hits and misses are counted per namespace. Concurrent
+misses on the same key share one load (see singleflight.py).
+"""
+
+import time
+from collections import OrderedDict, defaultdict
+from singleflight import SingleFlight
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+        self.invalidations = 0
+        self.flights = SingleFlight()
+
+    def get(self, key):
+        """Return ``(True, value)`` for a fresh entry, ``(False, None)`` otherwise."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits[key[0]] += 1
+                return True, value
+            del self._entries[key]
+        self.misses[key[0]] += 1
+        return False, None
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries when full."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key, loader):
+        """
+        Return the cached value for ``key``, awaiting ``loader()`` on a miss.
+        Concurrent misses on ``key`` await a single ``loader()`` call. ``None``
+        results are not stored, so lookups of records that do not exist yet
+        are retried next time.
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+        return await self.flights.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key, loader):
+        invalidations = self.invalidations
+        value = await loader()
+        # Results of loads that overlapped an invalidation may predate the write
+        if value is not None and self.invalidations == invalidations:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, *namespaces):
+        """Drop every entry in the given namespaces, or the whole cache if none are given."""
+        if not namespaces:
+            self._entries.clear()
+        else:
+            for key in [key for key in self._entries if key[0] in namespaces]:
+                del self._entries[key]
+        self.flights.forget(*namespaces)
+        self.invalidations += 1
+
+    def stats(self):
+        """Counters for tuning the TTL and size of the cache."""
+        namespaces = sorted(set(self.hits) | set(self.misses))
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "namespaces": {
+                namespace: {"hits": self.hits[namespace], "misses": self.misses[namespace]}
+                for namespace in namespaces
+            },
+            "coalescing": self.flights.stats(),
+        }
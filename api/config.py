@@ -3,9 +3,15 @@ Configuration settings for the StaffAI application.
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Make the repository root importable so the API can share code in src/
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
 # Load environment variables from .env file if it exists
 env_path = Path(__file__).parent / '.env'
 if env_path.exists():
@@ -17,6 +23,64 @@ NEO4J_USER = os.environ.get("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "twerstwers")
 NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE", "twemployee")
 
+# How the API talks to Neo4j: "async" (native async driver) or
+# "threadpool" (sync driver with each call offloaded to a worker thread)
+NEO4J_ACCESS_MODE = os.environ.get("NEO4J_ACCESS_MODE", "async")
+
+# Where the API keeps its data: "neo4j", or "memory" for an in-process graph
+# seeded from the sample data (load tests and running without a database)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "neo4j")
+
+# Driver connection pool and transaction retries (times in seconds)
+NEO4J_MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "100"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.environ.get("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.environ.get("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.environ.get("NEO4J_MAX_TRANSACTION_RETRY_TIME", "30"))
+
+# Startup: the API comes up without Neo4j and keeps retrying the connection
+# in the background, backing off up to NEO4J_CONNECT_RETRY_MAX_SECONDS
+NEO4J_CONNECT_RETRY_MAX_SECONDS = float(os.environ.get("NEO4J_CONNECT_RETRY_MAX_SECONDS", "30"))
+STARTUP_TARGET_MS = float(os.environ.get("STARTUP_TARGET_MS", "2000"))
+
+# API settings
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "200"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "1000"))
+SEARCH_RESULT_LIMIT = int(os.environ.get("SEARCH_RESULT_LIMIT", "50"))
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "500"))
+MAX_BULK_BATCH_SIZE = int(os.environ.get("MAX_BULK_BATCH_SIZE", "5000"))
+
+# Semantic search: must match the model used by the setup scripts
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+SEMANTIC_MAX_K = int(os.environ.get("SEMANTIC_MAX_K", "100"))
+
+# Demand matching: default and maximum per-request time budget
+DEMAND_MATCH_BUDGET_MS = int(os.environ.get("DEMAND_MATCH_BUDGET_MS", "2000"))
+DEMAND_MATCH_MAX_BUDGET_MS = int(os.environ.get("DEMAND_MATCH_MAX_BUDGET_MS", "10000"))
+
+# Admission control: concurrent Neo4j queries per class, how many more may
+# queue for a slot, and how long they may wait before getting a 503
+ADMISSION_LOOKUP_LIMIT = int(os.environ.get("ADMISSION_LOOKUP_LIMIT", "64"))
+ADMISSION_LOOKUP_QUEUE = int(os.environ.get("ADMISSION_LOOKUP_QUEUE", "256"))
+ADMISSION_LOOKUP_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_LOOKUP_QUEUE_TIMEOUT", "2"))
+ADMISSION_MATCHING_LIMIT = int(os.environ.get("ADMISSION_MATCHING_LIMIT", "16"))
+ADMISSION_MATCHING_QUEUE = int(os.environ.get("ADMISSION_MATCHING_QUEUE", "32"))
+ADMISSION_MATCHING_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_MATCHING_QUEUE_TIMEOUT", "5"))
+
+# In-process cache for read-mostly queries (set CACHE_TTL_SECONDS=0 to disable)
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "1024"))
+
+# How often to poll the graph data version for changes made by other processes
+DATA_VERSION_REFRESH_SECONDS = float(os.environ.get("DATA_VERSION_REFRESH_SECONDS", "5"))
+
+# In-memory snapshot of profiles, roles and tools: checked every
+# SNAPSHOT_REFRESH_SECONDS and reloaded when the graph changed. It serves reads
+# while Neo4j is down, and all the time if SNAPSHOT_SERVE_READS is set.
+SNAPSHOT_ENABLED = os.environ.get("SNAPSHOT_ENABLED", "true").lower() == "true"
+SNAPSHOT_REFRESH_SECONDS = float(os.environ.get("SNAPSHOT_REFRESH_SECONDS", "30"))
+SNAPSHOT_SERVE_READS = os.environ.get("SNAPSHOT_SERVE_READS", "false").lower() == "true"
+
 # API settings
 API_HOST = os.environ.get("API_HOST", "0.0.0.0")
 API_PORT = int(os.environ.get("API_PORT", "8080"))
@@ -27,5 +91,8 @@ if __name__ == "__main__":
     print(f"NEO4J_URL: {NEO4J_URL}")
     print(f"NEO4J_USER: {NEO4J_USER}")
     print(f"NEO4J_DATABASE: {NEO4J_DATABASE}")
+    print(f"NEO4J_ACCESS_MODE: {NEO4J_ACCESS_MODE}")
+    print(f"STORAGE_BACKEND: {STORAGE_BACKEND}")
+    print(f"NEO4J_MAX_POOL_SIZE: {NEO4J_MAX_POOL_SIZE}")
     print(f"API_HOST: {API_HOST}")
     print(f"API_PORT: {API_PORT}")
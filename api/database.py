@@ -0,0 +1,644 @@
+"""
+Neo4j data-access layer for the StaffAI API.
+
+The Cypher lives in ``ProfileQueries`` and is shared by two connections:
+``Neo4jConnection`` uses the blocking driver and ``AsyncNeo4jConnection`` uses
+the native async driver. ``create_connection`` picks one according to
+``NEO4J_ACCESS_MODE`` so both paths can be benchmarked against each other.
+With ``STORAGE_BACKEND=memory`` it returns ``MemoryConnection`` instead, which
+serves the same interface (``src.repository.ProfileRepository``) from an
+in-process ``MemoryGraph`` without Neo4j.
+
+Reads and writes run as managed transactions (``execute_read`` /
+``execute_write``): the driver routes reads to followers in a cluster and
+retries both on transient errors for up to NEO4J_MAX_TRANSACTION_RETRY_TIME.
+"""
+
+import base64
+import json
+import re
+import threading
+from abc import abstractmethod
+from contextlib import contextmanager, asynccontextmanager
+from neo4j import GraphDatabase, AsyncGraphDatabase, Query, READ_ACCESS, WRITE_ACCESS, unit_of_work
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+from starlette.concurrency import run_in_threadpool
+from config import (NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, NEO4J_ACCESS_MODE, STORAGE_BACKEND,
+                    NEO4J_MAX_POOL_SIZE, NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                    NEO4J_MAX_CONNECTION_LIFETIME, NEO4J_MAX_TRANSACTION_RETRY_TIME)
+from metrics import metrics
+from src.memory_graph import MemoryGraph
+from src.repository import ProfileRepository, PROFILE_PROPERTIES
+from src.schema import SYNC_SEQUENCE_QUERIES
+from src.slow_query_log import slow_query_log
+from src.query.demand_query import ONE_HOP_QUERY, TWO_HOP_QUERY
+
+# Errors meaning Neo4j cannot be reached at all (see breaker.py)
+CONNECTION_ERRORS = (ServiceUnavailable, SessionExpired)
+
+# Result transforms, applied to the list of records returned by a query
+def _as_dicts(records):
+    return [dict(record) for record in records]
+
+def _first_as_dict(records):
+    return dict(records[0]) if records else None
+
+def _column(key):
+    return lambda records: [record[key] for record in records]
+
+def _first_value(key):
+    return lambda records: records[0][key] if records else None
+
+# Keyset pagination cursors: an opaque, URL-safe encoding of the sort key
+# values of the last row on a page
+def encode_cursor(*values):
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Decode a cursor from ``encode_cursor``; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
+
+LUCENE_SPECIAL_CHARS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+def _fulltext_query(text):
+    """
+    Turn free text from the search box into a Lucene query in which every
+    term must match, either exactly or as a prefix of a longer word.
+    """
+    terms = [LUCENE_SPECIAL_CHARS.sub(r"\\\1", term.lower()) for term in text.split()]
+    return " AND ".join(f"({term} OR {term}*)" for term in terms)
+
+def _profile_projection(fields=None):
+    """
+    Build the RETURN projection for the requested profile properties.
+    ``emp_id`` is always included because it is the pagination key.
+    """
+    selected = [name for name in PROFILE_PROPERTIES
+                if fields is None or name in fields or name == "emp_id"]
+    return ",\n    ".join(f"p.{name} as {name}" for name in selected)
+
+def _page_query(match, projection, order_by, keyset=None, limit=None):
+    """Assemble a list query, optionally restricted to one keyset page."""
+    clauses = [match]
+    if keyset:
+        clauses.append(f"WHERE {keyset}")
+    clauses.append(f"RETURN {projection}")
+    clauses.append(f"ORDER BY {order_by}")
+    if limit is not None:
+        clauses.append("LIMIT $limit")
+    return "\n".join(clauses)
+
+# Cypher queries
+PROFILE_FIELDS = """
+    p.emp_id as emp_id,
+    p.name as name,
+    p.role as role,
+    p.grade as grade,
+    p.office as office,
+    p.description as description
+"""
+
+ALL_PROFILES_MATCH = "MATCH (p:Person)"
+
+# Graph data version, bumped by every write (see versioning.py)
+BUMP_DATA_VERSION = """
+    MERGE (v:DataVersion {name: 'graph'})
+    SET v.version = coalesce(v.version, 0) + 1,
+        v.updated_at = timestamp()
+"""
+
+DATA_VERSION_QUERY = """
+    OPTIONAL MATCH (v:DataVersion {name: 'graph'})
+    RETURN v.version as version, v.updated_at as updated_at
+"""
+
+# emp_id comes from a Sequence node (see src/schema.py). Incrementing it locks
+# the node until commit, so concurrent creates get distinct IDs.
+# Zero-pad a sequence value held in next_id to the three-digit emp_id format
+PAD_EMP_ID = "CASE WHEN size(next_id) < 3 THEN right('00' + next_id, 3) ELSE next_id END"
+
+CREATE_PROFILE_QUERY = f"""
+    MERGE (s:Sequence {{name: 'emp_id'}})
+    ON CREATE SET s.value = 0
+    SET s.value = s.value + 1
+    WITH toString(s.value) AS next_id
+    WITH {PAD_EMP_ID} AS emp_id
+    CREATE (p:Person {{
+        emp_id: emp_id,
+        name: 'Profile ' + emp_id,
+        role: $role,
+        grade: $grade,
+        office: $office,
+        description: $description,
+        start_date: $start_date,
+        end_date: $end_date
+    }})
+    MERGE (r:Role {{name: $role}})
+    CREATE (p)-[:CAN_PLAY]->(r)
+    WITH p
+    {BUMP_DATA_VERSION}
+    RETURN {PROFILE_FIELDS},
+           v.version as data_version,
+           v.updated_at as data_updated_at
+"""
+
+# Creates one batch of profiles, reserving a block of emp_ids up front
+CREATE_PROFILES_QUERY = f"""
+    MERGE (s:Sequence {{name: 'emp_id'}})
+    ON CREATE SET s.value = 0
+    SET s.value = s.value + size($rows)
+    WITH s.value - size($rows) AS base
+    UNWIND range(0, size($rows) - 1) AS i
+    WITH toString(base + i + 1) AS next_id, $rows[i] AS row
+    WITH {PAD_EMP_ID} AS emp_id, row
+    CREATE (p:Person {{
+        emp_id: emp_id,
+        name: 'Profile ' + emp_id,
+        role: row.role,
+        grade: row.grade,
+        office: row.office,
+        description: row.job_description,
+        start_date: row.start_date,
+        end_date: row.end_date
+    }})
+    MERGE (r:Role {{name: row.role}})
+    CREATE (p)-[:CAN_PLAY]->(r)
+    WITH collect(p.emp_id) AS emp_ids
+    {BUMP_DATA_VERSION}
+    RETURN emp_ids,
+           v.version as data_version,
+           v.updated_at as data_updated_at
+"""
+
+DEMAND_FIELDS = """
+    d.id as id,
+    d.role as role,
+    d.grade as grade,
+    d.start_date as start_date,
+    d.end_date as end_date,
+    d.office as office,
+    d.job_description as job_description,
+    d.description as description
+"""
+
+CREATE_DEMAND_QUERY = f"""
+    MERGE (s:Sequence {{name: 'demand_id'}})
+    ON CREATE SET s.value = 0
+    SET s.value = s.value + 1
+    CREATE (d:Demand {{
+        id: toString(s.value),
+        role: $role,
+        grade: $grade,
+        start_date: $start_date,
+        end_date: $end_date,
+        office: $office,
+        job_description: $job_description,
+        description: $description
+    }})
+    WITH d
+    CALL db.create.setNodeVectorProperty(d, 'embedding', $embedding)
+    WITH d
+    OPTIONAL MATCH (r:Role {{name: $role}})
+    FOREACH (_ IN CASE WHEN r IS NULL THEN [] ELSE [1] END | CREATE (d)-[:REQUIRES]->(r))
+    RETURN {DEMAND_FIELDS}
+"""
+
+DEMAND_BY_ID_QUERY = f"""
+    MATCH (d:Demand {{id: $id}})
+    RETURN {DEMAND_FIELDS}
+"""
+
+# Uses the person_search full-text index created in src/schema.py
+SEARCH_PROFILES_QUERY = f"""
+    CALL db.index.fulltext.queryNodes('person_search', $query) YIELD node AS p, score
+    RETURN {PROFILE_FIELDS}
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+# Uses the person_embedding_vector index created in src/schema.py
+SEMANTIC_SEARCH_QUERY = f"""
+    CALL db.index.vector.queryNodes('person_embedding_vector', $k, $embedding) YIELD node AS p, score
+    RETURN {PROFILE_FIELDS},
+           score
+    ORDER BY score DESC
+"""
+
+PROFILE_DETAIL_FIELDS = f"""
+    {PROFILE_FIELDS},
+    [(p)-[:CAN_PLAY]->(r:Role) | r.name] as roles,
+    [(p)-[rel:HAS_SKILL]->(t:Tool) | {{name: t.name, rating: rel.rating}}] as skills
+"""
+
+PROFILE_BY_ID_QUERY = f"""
+    MATCH (p:Person {{emp_id: $id}})
+    RETURN {PROFILE_DETAIL_FIELDS}
+"""
+
+PROFILES_BY_IDS_QUERY = f"""
+    UNWIND $ids AS id
+    MATCH (p:Person {{emp_id: id}})
+    RETURN {PROFILE_DETAIL_FIELDS}
+"""
+
+# Every profile with its roles and skills, for the in-memory snapshot
+SNAPSHOT_PROFILES_QUERY = f"""
+    MATCH (p:Person)
+    RETURN {PROFILE_DETAIL_FIELDS}
+    ORDER BY p.emp_id
+"""
+
+ALL_ROLES_QUERY = """
+    MATCH (r:Role)
+    RETURN r.name as role
+    ORDER BY r.name
+"""
+
+ALL_TOOLS_QUERY = """
+    MATCH (t:Tool)
+    RETURN t.name as tool
+    ORDER BY t.name
+"""
+
+PROFILES_BY_ROLE_MATCH = "MATCH (p:Person)-[:CAN_PLAY]->(r:Role {name: $role})"
+
+PROFILES_BY_TOOL_MATCH = "MATCH (p:Person)-[rel:HAS_SKILL]->(t:Tool {name: $tool})"
+
+# Keyset predicates: rows strictly after the cursor in the page sort order
+EMP_ID_KEYSET = "p.emp_id > $after_id"
+RATING_KEYSET = "rel.rating < $after_rating OR (rel.rating = $after_rating AND p.emp_id > $after_id)"
+
+class ProfileQueries(ProfileRepository):
+    """
+    Query methods shared by the sync and async connections.
+
+    Every method returns whatever ``_execute`` returns: plain values on
+    ``Neo4jConnection`` and awaitables on ``AsyncNeo4jConnection``. The
+    stream_* methods likewise return a generator or an async generator.
+    """
+
+    @abstractmethod
+    def _execute(self, name, query, params=None, transform=_as_dicts, write=False, timeout=None):
+        """
+        Run ``query`` and apply ``transform`` to its records. ``name`` labels
+        the query in the latency metrics and the slow-query log. The query runs
+        in a managed read or write transaction, which the driver retries on
+        transient errors. ``timeout`` (seconds) makes the server abort it if it
+        runs longer.
+        """
+
+    @abstractmethod
+    def _stream(self, name, query, params=None):
+        """Yield records of ``query`` as dicts straight from the driver cursor."""
+
+    def test_connection(self):
+        """Check that Neo4j answers a trivial query."""
+        return self._execute("test_connection", "RETURN 'Connection successful' as message",
+                             transform=_first_value("message"))
+
+    def get_data_version(self):
+        """Get the graph data version and when it was last bumped."""
+        return self._execute("data_version", DATA_VERSION_QUERY, transform=_first_as_dict)
+
+    def sync_id_sequence(self, name):
+        """Move an ID sequence ("emp_id" or "demand_id") past the highest ID in the graph."""
+        return self._execute("sync_id_sequence", SYNC_SEQUENCE_QUERIES[name],
+                             transform=_first_value("value"), write=True)
+
+    def create_profile(self, profile_data):
+        """
+        Create a new profile in Neo4j and link it to its Role.
+        The returned profile also carries the bumped graph data version.
+        """
+        return self._execute("create_profile", CREATE_PROFILE_QUERY, {
+            "role": profile_data.role,
+            "grade": profile_data.grade,
+            "office": profile_data.office,
+            "description": profile_data.job_description,
+            "start_date": profile_data.start_date,
+            "end_date": profile_data.end_date,
+        }, transform=_first_as_dict, write=True)
+
+    def create_profiles(self, rows):
+        """
+        Create a batch of profiles in one write transaction.
+        ``rows`` are ProfileCreate dicts; returns the new emp_ids in row order
+        together with the bumped graph data version.
+        """
+        return self._execute("create_profiles", CREATE_PROFILES_QUERY, {"rows": rows},
+                             transform=_first_as_dict, write=True)
+
+    def search_profiles(self, query, limit=50):
+        """Search profiles by name, role and description, most relevant first."""
+        return self._execute("search_profiles", SEARCH_PROFILES_QUERY,
+                             {"query": _fulltext_query(query), "limit": limit})
+
+    def semantic_search_profiles(self, embedding, k=10):
+        """Get the ``k`` profiles whose embeddings are closest to ``embedding``."""
+        return self._execute("semantic_search_profiles", SEMANTIC_SEARCH_QUERY, {"embedding": embedding, "k": k})
+
+    def create_demand(self, demand, description, embedding):
+        """Create a Demand with its embedding and link it to the Role it requires."""
+        return self._execute("create_demand", CREATE_DEMAND_QUERY,
+                             {**demand, "description": description, "embedding": embedding},
+                             transform=_first_as_dict, write=True)
+
+    def get_demand(self, id):
+        """Get a demand by ID."""
+        return self._execute("demand", DEMAND_BY_ID_QUERY, {"id": id}, transform=_first_as_dict)
+
+    def find_demand_matches(self, demand_id, hops=1, k=10, threshold=0.5, person_threshold=0.3, timeout=None):
+        """
+        Get the top ``k`` persons for a demand using the DemandQuery matching
+        queries: people who can play the required role (``hops=1``) or people
+        similar to them (``hops=2``). ``timeout`` is the transaction timeout in seconds.
+        """
+        query = ONE_HOP_QUERY if hops == 1 else TWO_HOP_QUERY
+        return self._execute(f"demand_matches_{hops}_hop", query,
+                             {"demand_id": demand_id, "threshold": threshold,
+                              "person_threshold": person_threshold, "limit": k},
+                             timeout=timeout)
+
+    def get_profile_by_id(self, id):
+        """Get profile by ID with roles and skills."""
+        return self._execute("profile_by_id", PROFILE_BY_ID_QUERY, {"id": id}, transform=_first_as_dict)
+
+    def get_profiles_by_ids(self, ids):
+        """Get profiles with roles and skills for several IDs, in the order given."""
+        return self._execute("profiles_by_ids", PROFILES_BY_IDS_QUERY, {"ids": ids})
+
+    def get_snapshot_profiles(self):
+        """Get every profile with roles and skills, ordered by emp_id."""
+        return self._execute("snapshot_profiles", SNAPSHOT_PROFILES_QUERY)
+
+    def get_all_roles(self):
+        """Get all roles."""
+        return self._execute("all_roles", ALL_ROLES_QUERY, transform=_column("role"))
+
+    def get_all_tools(self):
+        """Get all tools/skills."""
+        return self._execute("all_tools", ALL_TOOLS_QUERY, transform=_column("tool"))
+
+    # Listings. Each is built once and can either be fetched as a list
+    # (get_*) or streamed record by record from the driver cursor (stream_*).
+    def _all_profiles_query(self, limit=None, after=None, fields=None):
+        query = _page_query(ALL_PROFILES_MATCH, _profile_projection(fields), "p.emp_id",
+                            keyset=EMP_ID_KEYSET if after else None, limit=limit)
+        return query, {"limit": limit, "after_id": after[0] if after else None}
+
+    def _profiles_by_role_query(self, role, limit=None, after=None, fields=None):
+        query = _page_query(PROFILES_BY_ROLE_MATCH, _profile_projection(fields), "p.emp_id",
+                            keyset=EMP_ID_KEYSET if after else None, limit=limit)
+        return query, {"role": role, "limit": limit, "after_id": after[0] if after else None}
+
+    def _profiles_by_tool_query(self, tool, limit=None, after=None, fields=None):
+        # Pages are keyed on (rating, emp_id), so ``after`` holds both values
+        projection = _profile_projection(fields) + ",\n    rel.rating as rating"
+        query = _page_query(PROFILES_BY_TOOL_MATCH, projection, "rel.rating DESC, p.emp_id",
+                            keyset=RATING_KEYSET if after else None, limit=limit)
+        return query, {"tool": tool, "limit": limit,
+                       "after_rating": after[0] if after else None,
+                       "after_id": after[1] if after else None}
+
+    def get_all_profiles(self, limit=None, after=None, fields=None):
+        """
+        Get profiles ordered by emp_id.
+
+        Pass ``limit`` and the decoded cursor of the previous page as ``after``
+        to page through them; ``fields`` restricts the returned properties.
+        """
+        return self._execute("all_profiles", *self._all_profiles_query(limit, after, fields))
+
+    def stream_all_profiles(self, limit=None, after=None, fields=None):
+        """Like ``get_all_profiles``, but yields profiles as they arrive."""
+        return self._stream("stream_all_profiles", *self._all_profiles_query(limit, after, fields))
+
+    def get_profiles_by_role(self, role, limit=None, after=None, fields=None):
+        """Get profiles by role, ordered and paged by emp_id."""
+        return self._execute("profiles_by_role", *self._profiles_by_role_query(role, limit, after, fields))
+
+    def stream_profiles_by_role(self, role, limit=None, after=None, fields=None):
+        """Like ``get_profiles_by_role``, but yields profiles as they arrive."""
+        return self._stream("stream_profiles_by_role", *self._profiles_by_role_query(role, limit, after, fields))
+
+    def get_profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        """Get profiles by tool/skill with ratings, best rated first."""
+        return self._execute("profiles_by_tool", *self._profiles_by_tool_query(tool, limit, after, fields))
+
+    def stream_profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        """Like ``get_profiles_by_tool``, but yields profiles as they arrive."""
+        return self._stream("stream_profiles_by_tool", *self._profiles_by_tool_query(tool, limit, after, fields))
+
+# Driver settings shared by both connections
+POOL_CONFIG = {
+    "max_connection_pool_size": NEO4J_MAX_POOL_SIZE,
+    "connection_acquisition_timeout": NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+    "max_connection_lifetime": NEO4J_MAX_CONNECTION_LIFETIME,
+    "max_transaction_retry_time": NEO4J_MAX_TRANSACTION_RETRY_TIME,
+}
+
+class PoolUsage:
+    """
+    Sessions currently open against a driver. The driver does not expose its
+    pool, but each open session holds at most one pooled connection, so this is
+    an upper bound on pool utilization.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+    @property
+    def utilization(self):
+        return self.active / self.max_size if self.max_size else 0.0
+
+    def register_gauges(self):
+        metrics.gauge("staffai_db_sessions_active", "Neo4j sessions currently open.", lambda: self.active)
+        metrics.gauge("staffai_db_sessions_peak", "Most Neo4j sessions open at once.", lambda: self.peak)
+        metrics.gauge("staffai_db_pool_max_size", "Configured Neo4j connection pool size.", lambda: self.max_size)
+        metrics.gauge("staffai_db_pool_utilization", "Open sessions as a fraction of the pool size.",
+                      lambda: self.utilization)
+
+# Neo4j connection
+class Neo4jConnection(ProfileQueries):
+    """Blocking connection built on the synchronous Neo4j driver."""
+
+    def __init__(self, uri=NEO4J_URL, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password), **POOL_CONFIG)
+        self.database = database
+        self.pool = PoolUsage(POOL_CONFIG["max_connection_pool_size"])
+        self.pool.register_gauges()
+
+    def close(self):
+        self.driver.close()
+
+    @contextmanager
+    def _session(self, read=True):
+        self.pool.acquire()
+        try:
+            with self.driver.session(database=self.database,
+                                     default_access_mode=READ_ACCESS if read else WRITE_ACCESS) as session:
+                yield session
+        finally:
+            self.pool.release()
+
+    @abstractmethod
+    def _execute(self, name, query, params=None, transform=_as_dicts, write=False, timeout=None):
+        @unit_of_work(timeout=timeout)
+        def work(tx):
+            return list(tx.run(query, params or {}))
+
+        with metrics.query_timer(name) as timer:
+            with self._session(read=not write) as session:
+                records = session.execute_write(work) if write else session.execute_read(work)
+            timer.rows = len(records)
+
+        def profile():
+            with self._session() as session:
+                return session.run(Query("PROFILE " + query, timeout=timeout), params or {}).consume()
+
+        slow_query_log.check(name, query, params, timer.seconds, timer.rows,
+                             profile=None if write else profile)
+        return transform(records)
+
+    def _stream(self, name, query, params=None):
+        # Streams outlive a transaction function, so they run as auto-commit
+        # queries in a read session, which is still routed to a reader
+        with metrics.query_timer(name) as timer:
+            with self._session() as session:
+                for record in session.run(query, params or {}):
+                    timer.rows += 1
+                    yield dict(record)
+
+class AsyncNeo4jConnection(ProfileQueries):
+    """Non-blocking connection built on the native async Neo4j driver."""
+
+    def __init__(self, uri=NEO4J_URL, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE):
+        self.driver = AsyncGraphDatabase.driver(uri, auth=(user, password), **POOL_CONFIG)
+        self.database = database
+        self.pool = PoolUsage(POOL_CONFIG["max_connection_pool_size"])
+        self.pool.register_gauges()
+
+    async def close(self):
+        await self.driver.close()
+
+    @asynccontextmanager
+    async def _session(self, read=True):
+        self.pool.acquire()
+        try:
+            async with self.driver.session(database=self.database,
+                                           default_access_mode=READ_ACCESS if read else WRITE_ACCESS) as session:
+                yield session
+        finally:
+            self.pool.release()
+
+    async def _execute(self, name, query, params=None, transform=_as_dicts, write=False, timeout=None):
+        @unit_of_work(timeout=timeout)
+        async def work(tx):
+            result = await tx.run(query, params or {})
+            return [record async for record in result]
+
+        with metrics.query_timer(name) as timer:
+            async with self._session(read=not write) as session:
+                records = await (session.execute_write(work) if write else session.execute_read(work))
+            timer.rows = len(records)
+
+        async def profile():
+            async with self._session() as session:
+                result = await session.run(Query("PROFILE " + query, timeout=timeout), params or {})
+                return await result.consume()
+
+        slow_query_log.check(name, query, params, timer.seconds, timer.rows,
+                             profile=None if write else profile)
+        return transform(records)
+
+    async def _stream(self, name, query, params=None):
+        with metrics.query_timer(name) as timer:
+            async with self._session() as session:
+                result = await session.run(query, params or {})
+                async for record in result:
+                    timer.rows += 1
+                    yield dict(record)
+
+class ThreadPoolConnection:
+    """
+    Async facade over ``Neo4jConnection`` that runs every call in the
+    thread pool, so blocking Bolt round trips never stall the event loop.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __getattr__(self, name):
+        attr = getattr(self.connection, name)
+        # stream_* methods return lazy generators that Starlette already
+        # iterates in the thread pool, so they are handed out as they are
+        if not callable(attr) or name.startswith("stream_"):
+            return attr
+
+        async def offloaded(*args, **kwargs):
+            return await run_in_threadpool(attr, *args, **kwargs)
+
+        return offloaded
+
+class MemoryConnection:
+    """
+    Awaitable facade over a ``MemoryGraph``. Its operations are in-memory
+    index lookups and NumPy products, so they run inline on the event loop.
+    """
+
+    def __init__(self, graph=None):
+        self.graph = graph or MemoryGraph()
+
+    async def load_sample_data(self, embed=None):
+        """Replace the graph with the sample data; embedding runs in the thread pool."""
+        self.graph = await run_in_threadpool(MemoryGraph.from_sample_data, embed)
+
+    def __getattr__(self, name):
+        attr = getattr(self.graph, name)
+        if not callable(attr) or name.startswith("stream_"):
+            return attr
+
+        async def inline(*args, **kwargs):
+            return attr(*args, **kwargs)
+
+        return inline
+
+def create_connection(mode=NEO4J_ACCESS_MODE, backend=STORAGE_BACKEND):
+    """
+    Create the connection used by the API.
+
+    Every mode exposes the same awaitable interface:
+    - "async": native async driver, queries overlap on the event loop
+    - "threadpool": sync driver with every call offloaded to a worker thread
+    ``backend="memory"`` ignores the mode and returns an empty ``MemoryConnection``.
+    """
+    if backend == "memory":
+        return MemoryConnection()
+    if backend != "neo4j":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {backend!r} (expected 'neo4j' or 'memory')")
+    if mode == "async":
+        return AsyncNeo4jConnection()
+    if mode == "threadpool":
+        return ThreadPoolConnection(Neo4jConnection())
+    raise ValueError(f"Unknown NEO4J_ACCESS_MODE: {mode!r} (expected 'async' or 'threadpool')")
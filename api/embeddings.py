@@ -0,0 +1,48 @@
+"""
+Query embeddings for semantic profile search.
+
+The SentenceTransformer model is loaded lazily, once per process, on the first
+request that needs it. Query embeddings are memoised, so repeated searches only
+pay for the vector index lookup. ``encode`` is CPU-bound; callers on the event
+loop should run ``embed_query`` in the thread pool.
+"""
+
+import threading
+from functools import lru_cache
+from config import EMBEDDING_MODEL, QUERY_EMBEDDING_CACHE_SIZE
+from src.embedder import embed_batched
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """Return the process-wide embedding model, loading it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                # Imported here so API startup does not pay for loading torch
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _embed(text):
+    return get_model().encode(text).tolist()
+
+def embed_query(text):
+    """Embed a search query; whitespace and case differences share a cache entry."""
+    return _embed(" ".join(text.lower().split()))
+
+def embed_text(text):
+    """Embed a document (e.g. a demand description); not cached."""
+    return get_model().encode(text).tolist()
+
+def embed_texts(texts):
+    """Embed many documents in batches (see src/embedder.py); not cached."""
+    return embed_batched(get_model(), texts)
+
+def cache_info():
+    """Hit/miss counters of the query embedding cache."""
+    info = _embed.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
@@ -0,0 +1,129 @@
+"""
+Lightweight latency metrics exposed in the Prometheus text format.
+
+Records per named Cypher query (duration histogram, rows returned, errors) and
+per HTTP route (duration histogram, request count by status), plus gauges read
+at scrape time (e.g. connection pool usage). Recording is a few dictionary
+lookups under a lock, so it is cheap enough for every call.
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+# Upper bounds in seconds, from a fast index lookup to a slow matching query
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """Registry of the query and request metrics of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.query_latency = defaultdict(Histogram)
+        self.query_rows = defaultdict(int)
+        self.query_errors = defaultdict(int)
+        self.request_latency = defaultdict(Histogram)
+        self.requests = defaultdict(int)
+        self.gauges = {}
+
+    def observe_query(self, name, seconds, rows=0, error=False):
+        with self._lock:
+            self.query_latency[name].observe(seconds)
+            self.query_rows[name] += rows
+            if error:
+                self.query_errors[name] += 1
+
+    def observe_request(self, method, route, status, seconds):
+        with self._lock:
+            self.request_latency[(method, route)].observe(seconds)
+            self.requests[(method, route, status)] += 1
+
+    def gauge(self, name, help, read):
+        """Register a gauge whose value is ``read()`` at scrape time."""
+        with self._lock:
+            self.gauges[name] = (help, read)
+
+    def query_timer(self, name):
+        """Context manager timing one query; set ``rows`` on it before it exits."""
+        return QueryTimer(self, name)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines.append("# HELP staffai_db_query_duration_seconds Duration of Neo4j queries by name.")
+            lines.append("# TYPE staffai_db_query_duration_seconds histogram")
+            for name, histogram in sorted(self.query_latency.items()):
+                lines.extend(histogram.render("staffai_db_query_duration_seconds", f'query="{_label(name)}"'))
+            lines.append("# HELP staffai_db_query_rows_total Rows returned by Neo4j queries by name.")
+            lines.append("# TYPE staffai_db_query_rows_total counter")
+            for name, rows in sorted(self.query_rows.items()):
+                lines.append(f'staffai_db_query_rows_total{{query="{_label(name)}"}} {rows}')
+            lines.append("# HELP staffai_db_query_errors_total Failed Neo4j queries by name.")
+            lines.append("# TYPE staffai_db_query_errors_total counter")
+            for name, errors in sorted(self.query_errors.items()):
+                lines.append(f'staffai_db_query_errors_total{{query="{_label(name)}"}} {errors}')
+            lines.append("# HELP staffai_http_request_duration_seconds Time to response headers by route.")
+            lines.append("# TYPE staffai_http_request_duration_seconds histogram")
+            for (method, route), histogram in sorted(self.request_latency.items()):
+                labels = f'method="{method}",route="{_label(route)}"'
+                lines.extend(histogram.render("staffai_http_request_duration_seconds", labels))
+            lines.append("# HELP staffai_http_requests_total HTTP requests by route and status.")
+            lines.append("# TYPE staffai_http_requests_total counter")
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'staffai_http_requests_total{{method="{method}",route="{_label(route)}",'
+                             f'status="{status}"}} {count}')
+            for name, (help, read) in sorted(self.gauges.items()):
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {read()}")
+        return "\n".join(lines) + "\n"
+
+class QueryTimer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.rows = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # GeneratorExit (a client abandoning a stream) is not a query error
+        error = exc_type is not None and issubclass(exc_type, Exception)
+        self.seconds = time.perf_counter() - self.started
+        self.metrics.observe_query(self.name, self.seconds, self.rows, error)
+        return False
+
+# Process-wide registry
+metrics = Metrics()
@@ -11,12 +11,14 @@ export NEO4J_URL=${NEO4J_URL:-"bolt://localhost:7687"}
 export NEO4J_USER=${NEO4J_USER:-"neo4j"}
 export NEO4J_PASSWORD=${NEO4J_PASSWORD:-"twerstwers"}
 export NEO4J_DATABASE=${NEO4J_DATABASE:-"twemployee"}
+export NEO4J_ACCESS_MODE=${NEO4J_ACCESS_MODE:-"async"}
 
 # Print connection info
 echo "Starting StaffAI API server with the following configuration:"
 echo "NEO4J_URL: $NEO4J_URL"
 echo "NEO4J_USER: $NEO4J_USER"
 echo "NEO4J_DATABASE: $NEO4J_DATABASE"
+echo "NEO4J_ACCESS_MODE: $NEO4J_ACCESS_MODE"
 
 # Run the FastAPI server
 uvicorn app:app --host 0.0.0.0 --port 8080 --reload
@@ -2,6 +2,7 @@
 Script to initialize the Neo4j database with sample data for the StaffAI application.
 """
 
+import argparse
 import sys
 import os
 from neo4j import GraphDatabase
@@ -12,7 +13,15 @@ from config import NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
 # Add the src directory to the path so we can import from there
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.data.sample_data import EMPLOYEES, DEMANDS, ROLES, TOOLS
-from src.schema import SCHEMA_QUERIES
+from src import descriptions
+from src.embedder import embed_batched, EMBEDDING_BATCH_SIZE, EMBEDDING_PROCESSES
+from src.embedding_cache import open_cache
+from src.bulk_write import write_batches, person_rows, can_play_rows, has_skill_rows, SEED_BATCH_SIZE
+from src.schema import SCHEMA_QUERIES, CLEAR_DATA_QUERY, BUMP_DATA_VERSION_QUERY, SYNC_SEQUENCE_QUERIES
+from src.schema import (CREATE_ROLES_QUERY, CREATE_TOOLS_QUERY, CREATE_PERSONS_QUERY,
+                        CREATE_CAN_PLAY_QUERY, CREATE_HAS_SKILL_QUERY, MERGE_ROLES_QUERY, MERGE_TOOLS_QUERY,
+                        PRUNE_ROLES_QUERY, PRUNE_TOOLS_QUERY)
+from src.graph_sync import read_person_state, plan_person_sync, apply_person_sync, merge_names
 
 class DatabaseSetup:
     def __init__(self, 
@@ -20,9 +29,16 @@ class DatabaseSetup:
                  user: str = NEO4J_USER, 
                  password: str = NEO4J_PASSWORD,
                  database: str = NEO4J_DATABASE,
-                 model_name: str = 'all-MiniLM-L6-v2'):
+                 model_name: str = 'all-MiniLM-L6-v2',
+                 embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+                 embedding_processes: int = EMBEDDING_PROCESSES,
+                 write_batch_size: int = SEED_BATCH_SIZE):
         """Initialize database and embedding model connections."""
         self.driver = GraphDatabase.driver(uri, auth=(user, password), database=database)
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_processes = embedding_processes
+        self.write_batch_size = write_batch_size
+        self.embedding_cache = open_cache(model_name)
         print("Loading embedding model...")
         try:
             self.model = SentenceTransformer(model_name)
@@ -38,24 +54,24 @@ class DatabaseSetup:
 
     def format_tools_description(self, tools):
         """Format tools and their ratings into a readable string."""
-        tools_list = [f"{tool} (rating: {rating})" for tool, rating in tools.items()]
-        return f"Skilled in {', '.join(tools_list)}."
+        return descriptions.format_tools_description(tools)
 
     def generate_profile_description(self, profile):
         """Generate a textual description for an employee profile."""
-        roles = ", ".join(profile['can_play'])
-        tools = self.format_tools_description(profile['tools'])
-        
-        description = f"Can play roles: {roles}. {tools}"
-        description += f" {profile['grade']} level position in {profile['office']}."
-        
-        return description
+        return descriptions.generate_profile_description(profile)
 
     def generate_embedding(self, text):
         """Generate embedding for a given text."""
-        if self.model:
-            return self.model.encode(text).tolist()
-        return []  # Return empty list if model is not available
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(self, texts):
+        """Generate embeddings for many texts in batches, reusing cached ones."""
+        if not self.model:
+            return [[] for _ in texts]  # Empty embeddings if model is not available
+        encode = lambda batch: embed_batched(self.model, batch, self.embedding_batch_size, self.embedding_processes)
+        if self.embedding_cache is None:
+            return encode(texts)
+        return self.embedding_cache.embed(texts, encode)
 
     def setup_schema(self):
         """Create constraints and indexes"""
@@ -65,72 +81,52 @@ class DatabaseSetup:
             print("✓ Schema setup complete")
 
     def clear_database(self):
-        """Remove all nodes and relationships"""
+        """Remove all nodes and relationships except the data version and ID sequences"""
         with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+            session.run(CLEAR_DATA_QUERY)
             print("✓ Database cleared")
 
     def create_roles(self):
         """Create Role nodes"""
         with self.driver.session() as session:
-            for role in ROLES:
-                session.run(
-                    "CREATE (r:Role {name: $name})",
-                    name=role
-                )
+            write_batches(session, CREATE_ROLES_QUERY, ROLES, self.write_batch_size)
             print("✓ Roles created")
 
     def create_tools(self):
         """Create Tool nodes"""
         with self.driver.session() as session:
-            for tool in TOOLS:
-                session.run(
-                    "CREATE (t:Tool {name: $name})",
-                    name=tool
-                )
+            write_batches(session, CREATE_TOOLS_QUERY, TOOLS, self.write_batch_size)
             print("✓ Tools created")
 
     def create_employees_with_embeddings(self):
         """Create Person nodes with embeddings and their relationships"""
+        # Describe every employee first so the model embeds them in batches
+        employees = list(EMPLOYEES.values())
+        profile_descriptions = [self.generate_profile_description(emp) for emp in employees]
+        embeddings = self.generate_embeddings(profile_descriptions)
+
         with self.driver.session() as session:
-            for emp in EMPLOYEES.values():
-                # Generate description and embedding
-                description = self.generate_profile_description(emp)
-                embedding = self.generate_embedding(description)
-                embedding_str = ','.join(map(str, embedding)) if embedding else ""
-                
-                # Create Person node with embedding
-                session.run("""
-                    CREATE (p:Person {
-                        emp_id: $emp_id,
-                        name: $name,
-                        role: $role,
-                        grade: $grade,
-                        office: $office,
-                        description: $description,
-                        embedding: $embedding_str
-                    })
-                """, **emp, description=description, embedding_str=embedding_str)
-
-                # Create relationships
-                for role in emp['can_play']:
-                    session.run("""
-                        MATCH (p:Person {emp_id: $emp_id})
-                        MATCH (r:Role {name: $role})
-                        CREATE (p)-[:CAN_PLAY]->(r)
-                    """, emp_id=emp['emp_id'], role=role)
-
-                for tool, rating in emp['tools'].items():
-                    session.run("""
-                        MATCH (p:Person {emp_id: $emp_id})
-                        MATCH (t:Tool {name: $tool})
-                        CREATE (p)-[:HAS_SKILL {rating: $rating}]->(t)
-                    """, emp_id=emp['emp_id'], tool=tool, rating=rating)
-                
-                print(f"✓ Created employee {emp['name']} with embedding")
-            
+            # Create all employee nodes, then their roles and tools
+            write_batches(session, CREATE_PERSONS_QUERY,
+                          person_rows(employees, profile_descriptions, embeddings), self.write_batch_size)
+            write_batches(session, CREATE_CAN_PLAY_QUERY, can_play_rows(employees), self.write_batch_size)
+            write_batches(session, CREATE_HAS_SKILL_QUERY, has_skill_rows(employees), self.write_batch_size)
+
             print("✓ Employees created with relationships and embeddings")
 
+    def sync_sequences(self):
+        """Move the ID sequences past the IDs assigned by the sample data."""
+        with self.driver.session() as session:
+            for name, query in SYNC_SEQUENCE_QUERIES.items():
+                value = session.run(query).single()["value"]
+                print(f"✓ Sequence {name} at {value}")
+
+    def bump_data_version(self):
+        """Bump the graph data version so the API invalidates cached responses."""
+        with self.driver.session() as session:
+            version = session.run(BUMP_DATA_VERSION_QUERY).single()["version"]
+            print(f"✓ Data version bumped to {version}")
+
     def validate_data(self):
         """Validate that nodes and embeddings were stored correctly."""
         with self.driver.session() as session:
@@ -183,15 +179,62 @@ class DatabaseSetup:
         self.create_roles()
         self.create_tools()
         self.create_employees_with_embeddings()
+        self.sync_sequences()
+        self.bump_data_version()
         self.validate_data()
+        if self.embedding_cache is not None:
+            stats = self.embedding_cache.stats()
+            print(f"✓ Embedding cache: {stats['hits']} reused, {stats['misses']} embedded, {stats['entries']} stored")
         print("\nDatabase setup completed successfully! ✨")
 
+    def sync_database(self, prune=False):
+        """
+        Bring an existing database in line with the sample data without clearing
+        it; see src/graph_sync.py. With ``prune`` people, roles and tools missing
+        from the sample data are deleted.
+        """
+        print("Starting incremental sync...")
+        self.setup_schema()
+        employees = list(EMPLOYEES.values())
+        profile_descriptions = [self.generate_profile_description(emp) for emp in employees]
+
+        with self.driver.session() as session:
+            # Role and tool nodes created or pruned also change what the API serves
+            names_changed = (merge_names(session, MERGE_ROLES_QUERY, ROLES)
+                             + merge_names(session, MERGE_TOOLS_QUERY, TOOLS))
+            plan = plan_person_sync(employees, profile_descriptions, read_person_state(session), prune)
+            embeddings = self.generate_embeddings([description for _, description in plan.to_embed])
+            apply_person_sync(session, plan, embeddings, self.write_batch_size)
+            print(f"✓ People synced: {plan.summary()}")
+            if prune:
+                roles = session.run(PRUNE_ROLES_QUERY, names=ROLES).single()["deleted"]
+                tools = session.run(PRUNE_TOOLS_QUERY, names=TOOLS).single()["deleted"]
+                print(f"✓ Pruned {roles} roles and {tools} tools")
+                names_changed += roles + tools
+
+        self.sync_sequences()
+        if plan.empty and not names_changed:
+            print("✓ Graph already up to date")
+        else:
+            self.bump_data_version()
+        self.validate_data()
+        print("\nDatabase sync completed successfully! ✨")
+
 def main():
     """Main function to setup the database"""
+    parser = argparse.ArgumentParser(description="Load the sample data into Neo4j")
+    parser.add_argument("--sync", action="store_true",
+                        help="apply only the changes to an existing graph instead of wiping and reloading it")
+    parser.add_argument("--prune", action="store_true",
+                        help="with --sync, also delete people, roles and tools missing from the sample data")
+    args = parser.parse_args()
     print("Initializing Neo4j database for StaffAI...")
     setup = DatabaseSetup()
     try:
-        setup.setup_database()
+        if args.sync:
+            setup.sync_database(prune=args.prune)
+        else:
+            setup.setup_database()
     except Exception as e:
         print(f"Error setting up database: {str(e)}")
     finally:
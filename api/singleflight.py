@@ -0,0 +1,60 @@
+"""
+Single-flight coalescing of identical concurrent loads.
+
+When many requests miss the cache for the same key at once (e.g. the whole team
+opening the dashboard), only the first runs the database call; the others
+await its result. Keys are tuples whose first element is a namespace, as in
+cache.py, and leader calls and coalesced calls are counted per namespace.
+"""
+
+import asyncio
+from collections import defaultdict
+
+class SingleFlight:
+    """At most one in-flight load per key; concurrent callers share its result."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = defaultdict(int)
+        self.coalesced = defaultdict(int)
+
+    async def do(self, key, loader):
+        """
+        Await ``loader()``, or the load already in flight for ``key``. The load
+        runs as its own task, so a caller that is cancelled (e.g. a client that
+        disconnected) does not cancel it for the others. Errors reach every caller.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls[key[0]] += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._done(key, task))
+        else:
+            self.coalesced[key[0]] += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark a failure as retrieved even if every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def forget(self, *namespaces):
+        """
+        Let later callers start a fresh load instead of joining one already in
+        flight for these namespaces (all if none are given), e.g. after a write.
+        """
+        for key in [key for key in self._inflight if not namespaces or key[0] in namespaces]:
+            del self._inflight[key]
+
+    def stats(self):
+        namespaces = sorted(set(self.calls) | set(self.coalesced))
+        return {
+            "in_flight": len(self._inflight),
+            "namespaces": {
+                namespace: {"calls": self.calls[namespace], "coalesced": self.coalesced[namespace]}
+                for namespace in namespaces
+            },
+        }
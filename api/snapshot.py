@@ -0,0 +1,101 @@
+"""
+In-memory snapshot of the Person/Role/Tool graph.
+
+The snapshot is reloaded in the background whenever the graph data version
+moves on (see versioning.py). While Neo4j is unreachable it answers the read
+endpoints in place of the database; with SNAPSHOT_SERVE_READS it answers them
+all the time, taking the hot reads off the database. Responses served from it
+are marked with ``X-Data-Source: snapshot`` and ``X-Snapshot-Age`` (seconds
+since the snapshot was last known to match the graph).
+
+The data is held in a ``MemoryGraph`` (src/memory_graph.py), the same engine
+behind STORAGE_BACKEND=memory, so paging, the tool keyset and search behave
+the same in both; a load builds a new graph and swaps it in.
+"""
+
+import time
+from src.memory_graph import MemoryGraph
+from src.repository import PROFILE_PROPERTIES
+
+class GraphSnapshot:
+    """A read-only copy of the profile data, replaced wholesale on each load."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.version = None
+        self.loaded_at = None
+        self.confirmed_at = None
+        self.roles = []
+        self.tools = []
+        self._graph = MemoryGraph(clock=clock)
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was last known to be current."""
+        return self.clock() - self.confirmed_at if self.loaded else None
+
+    def is_current(self, version):
+        return self.loaded and self.version == version
+
+    def confirm(self, version):
+        """Record that the graph is still at ``version``; True if no reload is needed."""
+        if self.is_current(version):
+            self.confirmed_at = self.clock()
+            return True
+        return False
+
+    def load(self, profiles, roles, tools, version):
+        """
+        Replace the snapshot with ``profiles`` (rows shaped like
+        PROFILE_DETAIL_FIELDS, in emp_id order) and the role and tool names.
+        """
+        graph = MemoryGraph(clock=self.clock)
+        for role in roles:
+            graph.add_role(role)
+        for tool in tools:
+            graph.add_tool(tool)
+        for profile in profiles:
+            graph.add_person({name: profile.get(name) for name in PROFILE_PROPERTIES})
+            for role in profile.get("roles") or ():
+                graph.add_can_play(profile["emp_id"], role)
+            for skill in profile.get("skills") or ():
+                graph.add_skill(profile["emp_id"], skill["name"], skill["rating"])
+
+        # Swap the whole graph in at once so concurrent readers never see a mix
+        self._graph = graph
+        self.roles, self.tools = list(roles), list(tools)
+        self.version = version
+        self.loaded_at = self.confirmed_at = self.clock()
+
+    def stats(self):
+        return {
+            "loaded": self.loaded,
+            "version": self.version,
+            "age_seconds": round(self.age, 1) if self.loaded else None,
+            "profiles": len(self._graph.persons),
+            "roles": len(self.roles),
+            "tools": len(self.tools),
+        }
+
+    def all_profiles(self, limit=None, after=None, fields=None):
+        return self._graph.get_all_profiles(limit, after, fields)
+
+    def profiles_by_role(self, role, limit=None, after=None, fields=None):
+        return self._graph.get_profiles_by_role(role, limit, after, fields)
+
+    def profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        return self._graph.get_profiles_by_tool(tool, limit, after, fields)
+
+    def profile_by_id(self, emp_id):
+        return self._graph.get_profile_by_id(emp_id)
+
+    def profiles_by_ids(self, emp_ids):
+        return self._graph.get_profiles_by_ids(emp_ids)
+
+    def search(self, text, limit=50):
+        """Every term must match a word of the name, role or description, as in the full-text search."""
+        return self._graph.search_profiles(text, limit)
@@ -24,21 +24,55 @@ def test_health():
     response = requests.get(f"{API_URL}/health")
     print_response(response, "Health Check")
 
+def test_ready():
+    """Test the readiness probe (503 until Neo4j is connected)."""
+    response = requests.get(f"{API_URL}/ready")
+    print_response(response, "Readiness Check")
+
 def test_get_profiles():
     """Test the get profiles endpoint."""
     response = requests.get(f"{API_URL}/profiles")
     print_response(response, "Get Profiles")
 
+def test_get_profiles_paged(limit=2, fields="emp_id,name,role"):
+    """Test keyset pagination and field projection on the profiles endpoint."""
+    response = requests.get(f"{API_URL}/profiles", params={"limit": limit, "fields": fields})
+    print_response(response, f"Get Profiles Page 1 (limit={limit}, fields={fields})")
+    cursor = response.headers.get("X-Next-Cursor")
+    if cursor:
+        response = requests.get(f"{API_URL}/profiles",
+                                params={"limit": limit, "fields": fields, "cursor": cursor})
+        print_response(response, f"Get Profiles Page 2 (cursor={cursor})")
+
+def test_stream_profiles():
+    """Test streaming the profiles endpoint as NDJSON."""
+    response = requests.get(f"{API_URL}/profiles", headers={"Accept": "application/x-ndjson"}, stream=True)
+    print("\n=== Stream Profiles (NDJSON) ===")
+    print(f"Status Code: {response.status_code}")
+    print(f"Content-Type: {response.headers.get('Content-Type')}")
+    lines = [line for line in response.iter_lines() if line]
+    print(f"Streamed {len(lines)} profiles")
+
 def test_search_profiles(query="data"):
     """Test the search profiles endpoint."""
     response = requests.get(f"{API_URL}/profiles/search?query={query}")
     print_response(response, f"Search Profiles (query={query})")
 
+def test_semantic_search(query="machine learning with python", k=5):
+    """Test the semantic profile search endpoint."""
+    response = requests.get(f"{API_URL}/profiles/semantic", params={"q": query, "k": k})
+    print_response(response, f"Semantic Search (q={query}, k={k})")
+
 def test_get_profile_by_id(id="001"):
     """Test the get profile by ID endpoint."""
     response = requests.get(f"{API_URL}/profiles/{id}")
     print_response(response, f"Get Profile by ID (id={id})")
 
+def test_get_profiles_batch(ids=("001", "002")):
+    """Test the batch profile detail endpoint."""
+    response = requests.post(f"{API_URL}/profiles/batch", json={"emp_ids": list(ids)})
+    print_response(response, f"Get Profiles Batch (ids={', '.join(ids)})")
+
 def test_get_roles():
     """Test the get roles endpoint."""
     response = requests.get(f"{API_URL}/roles")
@@ -59,6 +93,41 @@ def test_get_profiles_by_tool(tool="Python"):
     response = requests.get(f"{API_URL}/profiles/tool/{tool}")
     print_response(response, f"Get Profiles by Tool (tool={tool})")
 
+def test_create_profiles_bulk():
+    """Test the bulk profile import endpoint with an NDJSON body."""
+    rows = [
+        {
+            "role": "Data Engineer",
+            "grade": "Mid",
+            "start_date": "2025-01-01",
+            "end_date": "2025-12-31",
+            "office": "London",
+            "job_description": "Builds data pipelines with Spark and Airflow."
+        },
+        {"role": "Missing fields"}
+    ]
+    response = requests.post(f"{API_URL}/profiles/bulk",
+                             data="\n".join(json.dumps(row) for row in rows),
+                             headers={"Content-Type": "application/x-ndjson"})
+    print_response(response, "Bulk Create Profiles (1 valid, 1 invalid row)")
+
+def test_demand_matches(hops=2, k=5):
+    """Test creating a demand and matching people to it."""
+    demand = {
+        "role": "Data Scientist",
+        "grade": "Senior",
+        "start_date": "2025-05-01",
+        "end_date": "2025-09-30",
+        "office": "New York",
+        "job_description": "Looking for a Data Scientist with strong Python and TensorFlow skills"
+    }
+    response = requests.post(f"{API_URL}/demands", json=demand)
+    print_response(response, "Create Demand")
+    if response.status_code == 200:
+        demand_id = response.json()["id"]
+        response = requests.get(f"{API_URL}/demands/{demand_id}/matches", params={"hops": hops, "k": k})
+        print_response(response, f"Demand Matches (id={demand_id}, hops={hops}, k={k})")
+
 def run_all_tests():
     """Run all API tests."""
     print(f"Testing StaffAI API with Neo4j database: {NEO4J_DATABASE}")
@@ -66,8 +135,12 @@ def run_all_tests():
     print(f"Neo4j User: {NEO4J_USER}")
     
     test_health()
+    test_ready()
     test_get_profiles()
+    test_get_profiles_paged()
+    test_stream_profiles()
     test_search_profiles()
+    test_semantic_search()
     test_get_roles()
     test_get_tools()
     
@@ -79,6 +152,7 @@ def run_all_tests():
             profile_id = profiles[0].get("emp_id")
             if profile_id:
                 test_get_profile_by_id(profile_id)
+            test_get_profiles_batch([profile["emp_id"] for profile in profiles[:5]])
     
     # Get the first role from the roles endpoint
     response = requests.get(f"{API_URL}/roles")
@@ -94,5 +168,9 @@ def run_all_tests():
         if tools:
             test_get_profiles_by_tool(tools[0])
 
+    # Writes last, so the reads above see the seeded data only
+    test_create_profiles_bulk()
+    test_demand_matches()
+
 if __name__ == "__main__":
     run_all_tests()
@@ -0,0 +1,75 @@
+"""
+Graph data version used for ETag / Last-Modified conditional GETs.
+
+The version lives on a ``(:DataVersion {name: 'graph'})`` node and is bumped by
+every write path (``create_profile`` and the setup scripts). The API keeps the
+last value it has seen in memory, so answering ``304 Not Modified`` needs no
+database query; a background task polls the node to pick up writes made by
+other processes.
+
+The same URL can be served as JSON or, with ``Accept: application/x-ndjson``,
+as NDJSON. Each representation gets its own ETag (``"v7"`` and
+``"v7-ndjson"``); the middleware adds ``Vary: Accept``.
+"""
+
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+class DataVersion:
+    """The last graph data version seen by this process."""
+
+    def __init__(self):
+        self.version = None
+        self.last_modified = None
+
+    @property
+    def known(self):
+        return self.version is not None
+
+    def etag(self, representation=None):
+        suffix = f"-{representation}" if representation else ""
+        return f'"v{self.version}{suffix}"'
+
+    @property
+    def last_modified_header(self):
+        return formatdate(self.last_modified, usegmt=True)
+
+    def update(self, version, updated_at=None):
+        """
+        Record a version read from the graph. ``updated_at`` is the node's
+        ``timestamp()`` in milliseconds. Returns True if the version moved
+        forward, i.e. cached data is now stale.
+        """
+        version = version or 0
+        if self.version is not None and version <= self.version:
+            return False
+        self.version = version
+        self.last_modified = updated_at / 1000 if updated_at else time.time()
+        return True
+
+    def is_not_modified(self, headers, representation=None):
+        """Evaluate If-None-Match / If-Modified-Since against the current version."""
+        if not self.known:
+            return False
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            # "*" is ignored: answering it needs to know that the URL has a
+            # representation (not a 404), which is only known after the route runs
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag(representation) in tags
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            # HTTP dates have one-second resolution
+            return int(self.last_modified) <= since
+        return False
+
+    def headers(self, representation=None):
+        return {
+            "ETag": self.etag(representation),
+            "Last-Modified": self.last_modified_header,
+            "Cache-Control": "no-cache",
+        }
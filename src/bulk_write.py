@@ -0,0 +1,46 @@
+"""
+Batched writes for the seeding scripts.
+
+``write_batches`` sends rows to an UNWIND query ``batch_size`` at a time, one
+explicit write transaction per batch, so seeding costs a round trip per batch
+instead of one per node or relationship. The default batch size comes from
+SEED_BATCH_SIZE in the environment.
+"""
+
+import os
+from typing import Any, Dict, List, Sequence
+from src.descriptions import description_hash
+
+SEED_BATCH_SIZE = int(os.environ.get("SEED_BATCH_SIZE", "1000"))
+
+def write_batches(session, query: str, rows: Sequence[Any], batch_size: int = SEED_BATCH_SIZE, **params) -> int:
+    """
+    Run ``query`` with ``$rows`` bound to successive batches and ``params``
+    bound as-is; returns the number of batches.
+    """
+    rows = list(rows)
+    batches = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        session.execute_write(lambda tx: tx.run(query, params, rows=batch).consume())
+        batches += 1
+    return batches
+
+def person_rows(employees: Sequence[Dict[str, Any]], descriptions: Sequence[str],
+                embeddings: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Person node rows for CREATE_PERSONS_QUERY; empty embeddings are left unset."""
+    return [
+        {"emp_id": emp["emp_id"], "name": emp["name"], "role": emp["role"], "grade": emp["grade"],
+         "office": emp["office"], "description": description,
+         "description_hash": description_hash(description), "embedding": embedding or None}
+        for emp, description, embedding in zip(employees, descriptions, embeddings)
+    ]
+
+def can_play_rows(employees: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """(emp_id, role) rows for CREATE_CAN_PLAY_QUERY."""
+    return [{"emp_id": emp["emp_id"], "role": role} for emp in employees for role in emp["can_play"]]
+
+def has_skill_rows(employees: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """(emp_id, tool, rating) rows for CREATE_HAS_SKILL_QUERY."""
+    return [{"emp_id": emp["emp_id"], "tool": tool, "rating": rating}
+            for emp in employees for tool, rating in emp["tools"].items()]
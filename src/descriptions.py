@@ -0,0 +1,37 @@
+"""
+Text descriptions of profiles and demands, the input to the embedding model.
+
+Shared by the setup scripts and the API so that embeddings created at seeding
+time and at request time are computed from text in the same format.
+"""
+
+import hashlib
+from typing import Dict, Any
+
+def format_tools_description(tools: Dict[str, int]) -> str:
+    """Format tools and their ratings into a readable string."""
+    tools_list = [f"{tool} (rating: {rating})" for tool, rating in tools.items()]
+    return f"Skilled in {', '.join(tools_list)}."
+
+def generate_profile_description(profile: Dict[str, Any]) -> str:
+    """Generate a textual description for an employee profile."""
+    roles = ", ".join(profile['can_play'])
+    tools = format_tools_description(profile['tools'])
+
+    description = f"Can play roles: {roles}. {tools}"
+    description += f" {profile['grade']} level position in {profile['office']}."
+
+    return description
+
+def generate_demand_description(demand: Dict[str, Any]) -> str:
+    """Generate a textual description for a job demand."""
+    description = demand['job_description']
+    additional_info = (
+        f" Position is for a {demand['grade']} {demand['role']} "
+        f"in {demand['office']}, from {demand['start_date']} to {demand['end_date']}."
+    )
+    return f"{description}{additional_info}"
+
+def description_hash(description: str) -> str:
+    """Short content hash stored next to a description to detect changes."""
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()[:16]
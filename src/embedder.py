@@ -0,0 +1,41 @@
+"""
+Batched embedding of descriptions for the seeding scripts.
+
+Encoding one string per ``encode`` call leaves most of the model's throughput
+unused; ``embed_batched`` hands the model whole batches instead and can spread
+them over several CPU worker processes. Defaults come from the environment:
+- EMBEDDING_BATCH_SIZE: texts per forward pass
+- EMBEDDING_PROCESSES: CPU worker processes (0 or 1 encodes in-process)
+"""
+
+import os
+import time
+from typing import List, Sequence
+
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_PROCESSES = int(os.environ.get("EMBEDDING_PROCESSES", "0"))
+
+def embed_batched(model, texts: Sequence[str], batch_size: int = EMBEDDING_BATCH_SIZE,
+                  processes: int = EMBEDDING_PROCESSES) -> List[List[float]]:
+    """
+    Embed ``texts`` in batches of ``batch_size`` and report embeddings/sec.
+    With ``processes`` > 1 the batches are encoded by a pool of CPU worker
+    processes, which needs the caller to run under ``if __name__ == "__main__"``.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    started = time.perf_counter()
+    if processes > 1:
+        pool = model.start_multi_process_pool(target_devices=["cpu"] * processes)
+        try:
+            vectors = model.encode_multi_process(texts, pool, batch_size=batch_size)
+        finally:
+            model.stop_multi_process_pool(pool)
+    else:
+        vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    elapsed = time.perf_counter() - started
+    workers = f"{processes} processes" if processes > 1 else "1 process"
+    print(f"✓ Embedded {len(texts)} texts in {elapsed:.1f}s "
+          f"({len(texts) / elapsed:.0f} embeddings/sec, batch size {batch_size}, {workers})")
+    return vectors.tolist()
@@ -0,0 +1,140 @@
+"""
+Content-addressed on-disk cache of text embeddings.
+
+Embeddings are keyed by a SHA-256 digest of (model name, text), so reseeding
+only encodes descriptions that are new or have changed. Each model gets its own
+directory holding:
+- ``vectors.f32``: the embeddings as raw float32 rows, opened with np.memmap
+- ``keys.bin``: the 16-byte key of each row, in row order
+- ``meta.json``: the model name and vector dimension
+
+Both data files are append-only and keys are written after their vectors, so
+an interrupted run leaves at worst a few rows that are ignored on the next
+open. A directory written for another model (two names can sanitise to the
+same directory) or with another vector dimension is discarded rather than
+mixed in. The cache assumes one writer at a time.
+
+Settings come from the environment:
+- EMBEDDING_CACHE: "false" disables the cache
+- EMBEDDING_CACHE_DIR: root directory (default .cache/embeddings in the repository)
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = str(Path(__file__).resolve().parent.parent / ".cache" / "embeddings")
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+KEY_BYTES = 16
+
+class EmbeddingCache:
+    """Embeddings of one model, looked up by text."""
+
+    def __init__(self, model_name: str, directory: str = EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        self.path = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.hits = 0
+        self.misses = 0
+        self.dimension = None
+        self._rows = {}
+        self._vectors = None
+        self._load()
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).digest()[:KEY_BYTES]
+
+    def _load(self):
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        if meta.get("model") != self.model_name:
+            self._clear()
+            return
+        self.dimension = meta["dimension"]
+        keys = (self.path / "keys.bin").read_bytes() if (self.path / "keys.bin").exists() else b""
+        vectors_path = self.path / "vectors.f32"
+        stored = vectors_path.stat().st_size // (4 * self.dimension) if vectors_path.exists() else 0
+        # Only rows with both a key and a complete vector count
+        count = min(len(keys) // KEY_BYTES, stored)
+        self._rows = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(count)}
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r",
+                                  shape=(stored, self.dimension)) if stored else None
+
+    def _clear(self):
+        """Drop every stored embedding, e.g. when the model or its dimension changed."""
+        self._rows, self._vectors, self.dimension = {}, None, None
+        for name in ("meta.json", "keys.bin", "vectors.f32"):
+            (self.path / name).unlink(missing_ok=True)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        row = self._rows.get(self.key(text))
+        if row is None:
+            return None
+        return self._vectors[row].tolist()
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Append embeddings for texts that are not cached yet."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        if self.dimension is not None and vectors.shape[1] != self.dimension:
+            # Same model name, different vectors: what is stored no longer applies
+            self._clear()
+        new = {}
+        for text, vector in zip(texts, vectors):
+            key = self.key(text)
+            if key not in self._rows and key not in new:
+                new[key] = vector
+        if not new:
+            return
+        matrix = np.stack(list(new.values()))
+        if self.dimension is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.dimension = matrix.shape[1]
+            (self.path / "meta.json").write_text(json.dumps({"model": self.model_name,
+                                                              "dimension": self.dimension}))
+        # Align the files first in case an earlier run was interrupted mid-write
+        first_row = len(self._rows)
+        with open(self.path / "vectors.f32", "r+b" if (self.path / "vectors.f32").exists() else "wb") as f:
+            f.truncate(first_row * 4 * self.dimension)
+            f.seek(0, os.SEEK_END)
+            f.write(matrix.tobytes())
+        with open(self.path / "keys.bin", "r+b" if (self.path / "keys.bin").exists() else "wb") as f:
+            f.truncate(first_row * KEY_BYTES)
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(new))
+        self._load()
+
+    def embed(self, texts: Sequence[str], encode: Callable[[List[str]], Sequence[Sequence[float]]]) -> List[List[float]]:
+        """
+        Return embeddings for ``texts``, calling ``encode`` only for the
+        distinct texts that are not cached and storing what it returns.
+        """
+        texts = list(texts)
+        found = [self.get(text) for text in texts]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, found) if vector is None))
+        self.hits += len(texts) - sum(vector is None for vector in found)
+        self.misses += len(missing)
+        if missing:
+            encoded = dict(zip(missing, encode(missing)))
+            self.put_many(missing, [encoded[text] for text in missing])
+            found = [vector if vector is not None else list(encoded[text]) for text, vector in zip(texts, found)]
+        return found
+
+    def stats(self):
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+def open_cache(model_name: str) -> Optional[EmbeddingCache]:
+    """The cache for ``model_name``, or None if EMBEDDING_CACHE is disabled."""
+    return EmbeddingCache(model_name) if EMBEDDING_CACHE_ENABLED else None
@@ -0,0 +1,144 @@
+"""
+Incremental sync of the sample data into an existing graph.
+
+Instead of wiping the database and reloading it, ``plan_person_sync`` diffs the
+source employees against the people already in the graph (by emp_id, their
+properties, the hash of their description, and their role and tool names) and
+``apply_person_sync`` writes only the deltas with batched MERGE/SET/DELETE
+queries. Every batch is its own transaction and nothing is deleted up front, so
+the API keeps serving the previous data while a sync runs, and running the same
+sync twice changes nothing.
+
+People are only deleted with ``prune``: profiles created through the API are
+not part of the sample data.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+from src.bulk_write import write_batches, SEED_BATCH_SIZE
+from src.descriptions import description_hash
+from src.schema import (PERSON_STATE_QUERY, DEMAND_HASHES_QUERY,
+                        UPSERT_PERSONS_QUERY, DELETE_PERSONS_QUERY,
+                        MERGE_CAN_PLAY_QUERY, DELETE_CAN_PLAY_QUERY,
+                        MERGE_HAS_SKILL_QUERY, DELETE_HAS_SKILL_QUERY,
+                        DELETE_SIMILAR_TO_QUERY, CREATE_SIMILAR_TO_QUERY)
+
+PERSON_FIELDS = ("name", "role", "grade", "office")
+
+class PersonSyncPlan:
+    """The writes that bring the graph's people in line with the source data."""
+
+    def __init__(self):
+        self.created = []      # emp_ids not in the graph yet
+        self.updated = []      # emp_ids whose properties changed
+        self.deleted = []      # emp_ids no longer in the source data
+        self.properties = {}   # emp_id -> changed properties
+        self.to_embed = []     # (emp_id, description) needing a new embedding
+        self.add_can_play = []
+        self.remove_can_play = []
+        self.set_has_skill = []
+        self.remove_has_skill = []
+
+    @property
+    def empty(self):
+        return not (self.properties or self.deleted or self.add_can_play or self.remove_can_play
+                    or self.set_has_skill or self.remove_has_skill)
+
+    def upsert_rows(self, embeddings: Sequence[Any]) -> List[Dict[str, Any]]:
+        """UPSERT_PERSONS_QUERY rows, with ``embeddings`` in the order of ``to_embed``."""
+        vectors = {emp_id: embedding or None for (emp_id, _), embedding in zip(self.to_embed, embeddings)}
+        return [{"emp_id": emp_id, "properties": changed, "embedding": vectors.get(emp_id)}
+                for emp_id, changed in self.properties.items()]
+
+    def summary(self):
+        return (f"{len(self.created)} created, {len(self.updated)} updated, {len(self.deleted)} deleted, "
+                f"{len(self.to_embed)} re-embedded, "
+                f"{len(self.add_can_play) + len(self.set_has_skill)} relationships set, "
+                f"{len(self.remove_can_play) + len(self.remove_has_skill)} removed")
+
+def read_person_state(session) -> Dict[str, Dict[str, Any]]:
+    """The properties, description hash, roles and skills of every person, by emp_id."""
+    records = session.execute_read(lambda tx: list(tx.run(PERSON_STATE_QUERY)))
+    return {
+        record["emp_id"]: {
+            **{field: record[field] for field in PERSON_FIELDS},
+            "description_hash": record["description_hash"],
+            "has_embedding": record["has_embedding"],
+            "roles": set(record["roles"]),
+            "tools": {skill["tool"]: skill["rating"] for skill in record["skills"]},
+        }
+        for record in records
+    }
+
+def plan_person_sync(employees: Sequence[Dict[str, Any]], descriptions: Sequence[str],
+                     state: Dict[str, Dict[str, Any]], prune: bool = False) -> PersonSyncPlan:
+    """
+    Diff ``employees`` (with their ``descriptions``) against ``state`` from
+    ``read_person_state``. With ``prune`` people missing from the source data
+    are deleted.
+    """
+    plan = PersonSyncPlan()
+    for emp, description in zip(employees, descriptions):
+        emp_id = emp["emp_id"]
+        current = state.get(emp_id)
+        wanted = {field: emp[field] for field in PERSON_FIELDS}
+        digest = description_hash(description)
+
+        if current is None:
+            plan.created.append(emp_id)
+            changed = wanted
+            current = {"roles": set(), "tools": {}}
+        else:
+            changed = {field: value for field, value in wanted.items() if current[field] != value}
+        if current.get("description_hash") != digest or not current.get("has_embedding"):
+            changed = {**changed, "description": description, "description_hash": digest}
+            plan.to_embed.append((emp_id, description))
+        if changed:
+            plan.properties[emp_id] = changed
+            if emp_id not in plan.created:
+                plan.updated.append(emp_id)
+
+        roles = set(emp["can_play"])
+        plan.add_can_play += [{"emp_id": emp_id, "role": role} for role in sorted(roles - current["roles"])]
+        plan.remove_can_play += [{"emp_id": emp_id, "role": role} for role in sorted(current["roles"] - roles)]
+        plan.set_has_skill += [{"emp_id": emp_id, "tool": tool, "rating": rating}
+                               for tool, rating in emp["tools"].items() if current["tools"].get(tool) != rating]
+        plan.remove_has_skill += [{"emp_id": emp_id, "tool": tool}
+                                  for tool in sorted(current["tools"]) if tool not in emp["tools"]]
+
+    if prune:
+        source_ids = {emp["emp_id"] for emp in employees}
+        plan.deleted = sorted(emp_id for emp_id in state if emp_id not in source_ids)
+    return plan
+
+def apply_person_sync(session, plan: PersonSyncPlan, embeddings: Sequence[Any],
+                      batch_size: int = SEED_BATCH_SIZE):
+    """
+    Write ``plan``: removals first, then people, then their relationships.
+    Roles and tools must already exist.
+    """
+    write_batches(session, DELETE_PERSONS_QUERY, plan.deleted, batch_size)
+    write_batches(session, DELETE_CAN_PLAY_QUERY, plan.remove_can_play, batch_size)
+    write_batches(session, DELETE_HAS_SKILL_QUERY, plan.remove_has_skill, batch_size)
+    write_batches(session, UPSERT_PERSONS_QUERY, plan.upsert_rows(embeddings), batch_size)
+    write_batches(session, MERGE_CAN_PLAY_QUERY, plan.add_can_play, batch_size)
+    write_batches(session, MERGE_HAS_SKILL_QUERY, plan.set_has_skill, batch_size)
+
+def merge_names(session, query: str, names: Sequence[str]) -> int:
+    """Run MERGE_ROLES_QUERY or MERGE_TOOLS_QUERY; returns the number of nodes it created."""
+    names = list(names)
+    return session.execute_write(lambda tx: tx.run(query, rows=names).consume().counters.nodes_created)
+
+def refresh_similarities(session, emp_ids: Sequence[str], batch_size: int = SEED_BATCH_SIZE):
+    """Recompute the SIMILAR_TO edges of people whose embeddings changed."""
+    emp_ids = list(emp_ids)
+    write_batches(session, DELETE_SIMILAR_TO_QUERY, emp_ids, batch_size)
+    write_batches(session, CREATE_SIMILAR_TO_QUERY, emp_ids, batch_size, changed=emp_ids)
+
+def changed_demands(session, demands: Sequence[Dict[str, Any]], descriptions: Sequence[str]) -> List[int]:
+    """Indexes of ``demands`` that are missing from the graph or whose description changed."""
+    ids = [demand["id"] for demand in demands]
+    records = session.execute_read(lambda tx: list(tx.run(DEMAND_HASHES_QUERY, ids=ids)))
+    stored = {record["id"]: record["description_hash"] for record in records}
+    return [i for i, (demand, description) in enumerate(zip(demands, descriptions))
+            if stored.get(demand["id"]) != description_hash(description)]
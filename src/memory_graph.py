@@ -0,0 +1,309 @@
+"""
+In-memory graph engine implementing ``ProfileRepository``.
+
+Holds Person, Role, Tool and Demand data in plain dicts with adjacency indexes
+for CAN_PLAY (role -> sorted emp_ids), HAS_SKILL (tool -> people sorted by
+rating) and SIMILAR_TO, an inverted index for text search, and the profile
+embeddings as one normalised float32 matrix, so vector search and demand
+matching are a single matrix-vector product. It needs no database, which makes
+it a test double for the API and DemandQuery and a fast read tier.
+"""
+
+import re
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src import descriptions
+from src.repository import ProfileRepository, PROFILE_PROPERTIES
+
+DEMAND_PROPERTIES = ("id", "role", "grade", "start_date", "end_date", "office", "job_description", "description")
+
+# Same pair threshold as the SIMILAR_TO pass in the setup scripts
+SIMILARITY_THRESHOLD = 0.8
+
+WORD = re.compile(r"\w+")
+
+def _words(*texts):
+    return set(WORD.findall(" ".join(text or "" for text in texts).lower()))
+
+def _normalise(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class MemoryGraph(ProfileRepository):
+    """Single-process graph store; not thread-safe for concurrent writes."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.persons: Dict[str, Dict[str, Any]] = {}
+        self.roles: set = set()
+        self.tools: set = set()
+        self.demands: Dict[str, Dict[str, Any]] = {}
+        self.sequences = {"emp_id": 0, "demand_id": 0}
+        self.version = 0
+        self.updated_at = None
+        # Adjacency and search indexes
+        self._emp_ids: List[str] = []
+        self._roles_of: Dict[str, List[str]] = {}
+        self._role_members: Dict[str, List[str]] = {}
+        self._skills_of: Dict[str, Dict[str, int]] = {}
+        self._tool_members: Dict[str, List[tuple]] = {}
+        self._similar: Dict[str, Dict[str, float]] = {}
+        self._requires: Dict[str, List[str]] = {}
+        self._postings: Dict[str, set] = {}
+        self._vocabulary: List[str] = []
+        # Embeddings: rows of the matrix follow _embedded_ids
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._matrix = None
+        self._embedded_ids: List[str] = []
+
+    # Building the graph
+
+    def add_role(self, name: str):
+        self.roles.add(name)
+
+    def add_tool(self, name: str):
+        self.tools.add(name)
+
+    def add_person(self, person: Dict[str, Any], embedding: Optional[Sequence[float]] = None):
+        """Add a Person from a row with the profile properties (extra keys are kept)."""
+        emp_id = person["emp_id"]
+        if emp_id in self.persons:
+            raise ValueError(f"Person {emp_id} already exists")
+        self.persons[emp_id] = dict(person)
+        insort(self._emp_ids, emp_id)
+        self._roles_of[emp_id] = []
+        self._skills_of[emp_id] = {}
+        for word in _words(person.get("name"), person.get("role"), person.get("description")):
+            if word not in self._postings:
+                self._postings[word] = set()
+                insort(self._vocabulary, word)
+            self._postings[word].add(emp_id)
+        if embedding is not None:
+            self._embeddings[emp_id] = _normalise(embedding)
+            self._matrix = None
+
+    def add_can_play(self, emp_id: str, role: str):
+        self.add_role(role)
+        self._roles_of[emp_id].append(role)
+        insort(self._role_members.setdefault(role, []), emp_id)
+
+    def add_skill(self, emp_id: str, tool: str, rating: int):
+        self.add_tool(tool)
+        self._skills_of[emp_id][tool] = rating
+        insort(self._tool_members.setdefault(tool, []), (-(rating or 0), emp_id))
+
+    def build_similarities(self, threshold: float = SIMILARITY_THRESHOLD):
+        """Link every pair of people whose embeddings are closer than ``threshold``."""
+        matrix, ids = self._embedding_matrix()
+        self._similar = {}
+        if not ids:
+            return
+        scores = matrix @ matrix.T
+        # Like the Cypher pass, each pair is linked once, from the lower emp_id
+        for i, j in zip(*np.nonzero(np.triu(scores > threshold, k=1))):
+            low, high = sorted((ids[i], ids[j]))
+            self._similar.setdefault(low, {})[high] = float(scores[i, j])
+
+    def bump_data_version(self):
+        self.version += 1
+        self.updated_at = int(self.clock() * 1000)
+        return {"data_version": self.version, "data_updated_at": self.updated_at}
+
+    @classmethod
+    def from_sample_data(cls, embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None):
+        """
+        Build a graph from ``src.data.sample_data`` as the setup scripts do.
+        ``embed`` maps a list of texts to their embeddings; without it the
+        graph has no vectors and semantic search and matching return nothing.
+        """
+        from src.data.sample_data import EMPLOYEES, DEMANDS, ROLES, TOOLS
+
+        graph = cls()
+        for role in ROLES:
+            graph.add_role(role)
+        for tool in TOOLS:
+            graph.add_tool(tool)
+        employees = list(EMPLOYEES.values())
+        texts = [descriptions.generate_profile_description(emp) for emp in employees]
+        vectors = embed(texts) if embed else [None] * len(employees)
+        for emp, text, vector in zip(employees, texts, vectors):
+            graph.add_person({**{key: emp.get(key) for key in PROFILE_PROPERTIES}, "description": text}, vector)
+            for role in emp["can_play"]:
+                graph.add_can_play(emp["emp_id"], role)
+            for tool, rating in emp["tools"].items():
+                graph.add_skill(emp["emp_id"], tool, rating)
+        graph.build_similarities()
+        demands = list(DEMANDS.values())
+        texts = [descriptions.generate_demand_description(demand) for demand in demands]
+        vectors = embed(texts) if embed else [None] * len(demands)
+        for demand, text, vector in zip(demands, texts, vectors):
+            graph._add_demand({**demand, "description": text}, vector)
+        graph.sync_id_sequence("emp_id")
+        graph.sync_id_sequence("demand_id")
+        graph.bump_data_version()
+        return graph
+
+    def _add_demand(self, demand, embedding):
+        self.demands[demand["id"]] = {**{key: demand.get(key) for key in DEMAND_PROPERTIES},
+                                      "embedding": None if embedding is None else _normalise(embedding)}
+        self._requires[demand["id"]] = [demand["role"]] if demand["role"] in self.roles else []
+
+    # Row shapes
+
+    def _profile(self, emp_id, fields=None):
+        person = self.persons[emp_id]
+        return {name: person.get(name) for name in PROFILE_PROPERTIES
+                if fields is None or name in fields or name == "emp_id"}
+
+    def _detail(self, emp_id):
+        return {**self._profile(emp_id),
+                "roles": list(self._roles_of[emp_id]),
+                "skills": [{"name": tool, "rating": rating} for tool, rating in self._skills_of[emp_id].items()]}
+
+    def _embedding_matrix(self):
+        if self._matrix is None:
+            self._embedded_ids = sorted(self._embeddings)
+            self._matrix = (np.stack([self._embeddings[emp_id] for emp_id in self._embedded_ids])
+                            if self._embedded_ids else np.zeros((0, 0), dtype=np.float32))
+        return self._matrix, self._embedded_ids
+
+    @staticmethod
+    def _page(emp_ids, limit, after):
+        start = bisect_right(emp_ids, after[0]) if after else 0
+        return emp_ids[start:start + limit if limit is not None else None]
+
+    # ProfileRepository
+
+    def close(self):
+        pass
+
+    def test_connection(self):
+        return "Connection successful"
+
+    def get_data_version(self):
+        return {"version": self.version, "updated_at": self.updated_at}
+
+    def sync_id_sequence(self, name):
+        ids = self.persons if name == "emp_id" else self.demands
+        highest = max((int(id) for id in ids if id.isdigit()), default=0)
+        self.sequences[name] = max(self.sequences[name], highest)
+        return self.sequences[name]
+
+    def _next_emp_id(self):
+        self.sequences["emp_id"] += 1
+        return str(self.sequences["emp_id"]).zfill(3)
+
+    def _create_person(self, row):
+        emp_id = self._next_emp_id()
+        self.add_person({"emp_id": emp_id, "name": f"Profile {emp_id}", "role": row["role"],
+                         "grade": row["grade"], "office": row["office"],
+                         "description": row["job_description"],
+                         "start_date": row["start_date"], "end_date": row["end_date"]})
+        self.add_can_play(emp_id, row["role"])
+        return emp_id
+
+    def create_profile(self, profile_data):
+        emp_id = self._create_person(profile_data.model_dump())
+        return {**self._profile(emp_id), **self.bump_data_version()}
+
+    def create_profiles(self, rows):
+        emp_ids = [self._create_person(row) for row in rows]
+        return {"emp_ids": emp_ids, **self.bump_data_version()}
+
+    def search_profiles(self, query, limit=50):
+        """Every term must match a word exactly or as a prefix; exact matches rank first."""
+        scores = None
+        for term in query.lower().split():
+            start = bisect_left(self._vocabulary, term)
+            end = bisect_left(self._vocabulary, term + "\uffff")
+            term_scores = {}
+            for word in self._vocabulary[start:end]:
+                for emp_id in self._postings[word]:
+                    term_scores[emp_id] = max(term_scores.get(emp_id, 0), 2 if word == term else 1)
+            scores = term_scores if scores is None else \
+                {emp_id: score + term_scores[emp_id] for emp_id, score in scores.items() if emp_id in term_scores}
+        ranked = sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))
+        return [self._profile(emp_id) for emp_id, _ in ranked[:limit]]
+
+    def semantic_search_profiles(self, embedding, k=10):
+        matrix, ids = self._embedding_matrix()
+        if not ids:
+            return []
+        cosine = matrix @ _normalise(embedding)
+        top = np.argsort(-cosine)[:k] if k >= len(ids) else \
+            sorted(np.argpartition(-cosine, k)[:k], key=lambda i: -cosine[i])
+        # Neo4j's vector index reports cosine similarity rescaled to [0, 1]
+        return [{**self._profile(ids[i]), "score": float((1 + cosine[i]) / 2)} for i in top]
+
+    def create_demand(self, demand, description, embedding):
+        self.sequences["demand_id"] += 1
+        id = str(self.sequences["demand_id"])
+        self._add_demand({**demand, "id": id, "description": description}, embedding)
+        return self.get_demand(id)
+
+    def get_demand(self, id):
+        demand = self.demands.get(id)
+        return {key: demand[key] for key in DEMAND_PROPERTIES} if demand else None
+
+    def find_demand_matches(self, demand_id, hops=1, k=10, threshold=0.5, person_threshold=0.3, timeout=None):
+        demand = self.demands.get(demand_id)
+        if demand is None or demand["embedding"] is None:
+            return []
+        candidates = {emp_id for role in self._requires[demand_id] for emp_id in self._role_members.get(role, [])}
+        if hops == 2:
+            candidates = {other for emp_id in candidates
+                          for other, score in self._similar.get(emp_id, {}).items()
+                          if other != emp_id and score > person_threshold}
+        matrix, ids = self._embedding_matrix()
+        rows = [index for index, emp_id in enumerate(ids) if emp_id in candidates]
+        if not rows:
+            return []
+        similarity = matrix[rows] @ demand["embedding"]
+        matches = [(float(score), ids[row]) for row, score in zip(rows, similarity) if score > threshold]
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [{**{key: self.persons[emp_id].get(key) for key in ("emp_id", "name", "role", "grade")},
+                 "similarity": score}
+                for score, emp_id in matches[:k]]
+
+    def get_profile_by_id(self, id):
+        return self._detail(id) if id in self.persons else None
+
+    def get_profiles_by_ids(self, ids):
+        return [self._detail(id) for id in ids if id in self.persons]
+
+    def get_snapshot_profiles(self):
+        return [self._detail(emp_id) for emp_id in self._emp_ids]
+
+    def get_all_roles(self):
+        return sorted(self.roles)
+
+    def get_all_tools(self):
+        return sorted(self.tools)
+
+    def get_all_profiles(self, limit=None, after=None, fields=None):
+        return [self._profile(emp_id, fields) for emp_id in self._page(self._emp_ids, limit, after)]
+
+    def stream_all_profiles(self, limit=None, after=None, fields=None):
+        yield from self.get_all_profiles(limit, after, fields)
+
+    def get_profiles_by_role(self, role, limit=None, after=None, fields=None):
+        members = self._role_members.get(role, [])
+        return [self._profile(emp_id, fields) for emp_id in self._page(members, limit, after)]
+
+    def stream_profiles_by_role(self, role, limit=None, after=None, fields=None):
+        yield from self.get_profiles_by_role(role, limit, after, fields)
+
+    def get_profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        members = self._tool_members.get(tool, [])
+        start = bisect_right(members, (-after[0], after[1])) if after else 0
+        end = start + limit if limit is not None else None
+        return [{**self._profile(emp_id, fields), "rating": -negative_rating}
+                for negative_rating, emp_id in members[start:end]]
+
+    def stream_profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        yield from self.get_profiles_by_tool(tool, limit, after, fields)
@@ -0,0 +1,59 @@
+"""
+Convert stored embeddings to float32 vectors in place.
+
+Older versions of api/setup_database.py stored each embedding as a comma-joined
+string, which neither the vector index nor gds.similarity.cosine can use. This
+rewrites those Person and Demand embeddings as float32 arrays in batches of
+SEED_BATCH_SIZE, one transaction per batch; embeddings that are already lists
+are not touched. It is safe to run while the API is up, and a re-run migrates
+nothing. The data version is bumped only if something was migrated, so the API
+drops cached responses.
+"""
+
+import argparse
+import os
+import sys
+from src.bulk_write import SEED_BATCH_SIZE
+from src.schema import MIGRATE_EMBEDDINGS_QUERIES, BUMP_DATA_VERSION_QUERY
+
+def migrate_embeddings(session, batch_size: int = SEED_BATCH_SIZE):
+    """Convert the string embeddings of every label; returns the number of nodes migrated per label."""
+    migrated = {}
+    for label, query in MIGRATE_EMBEDDINGS_QUERIES.items():
+        migrated[label], after = 0, ""
+        while True:
+            record = session.execute_write(
+                lambda tx: tx.run(query, after=after, batch_size=batch_size).single())
+            if not record["migrated"]:
+                break
+            migrated[label] += record["migrated"]
+            after = record["last_key"]
+        print(f"✓ {label}: {migrated[label]} embeddings stored as float32 vectors")
+    return migrated
+
+def main():
+    """Migrate the embeddings of the database configured for the API (see api/config.py)"""
+    # Imported here so migrate_embeddings can be used without the driver or the API config
+    from neo4j import GraphDatabase
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api'))
+    from config import NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+
+    parser = argparse.ArgumentParser(description="Convert stored embeddings to float32 vectors")
+    parser.add_argument("--uri", default=NEO4J_URL)
+    parser.add_argument("--user", default=NEO4J_USER)
+    parser.add_argument("--password", default=NEO4J_PASSWORD,
+                        help="defaults to NEO4J_PASSWORD from the environment or api/.env")
+    parser.add_argument("--database", default=NEO4J_DATABASE)
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+    args = parser.parse_args()
+    driver = GraphDatabase.driver(args.uri, auth=(args.user, args.password))
+    try:
+        with driver.session(database=args.database) as session:
+            if any(migrate_embeddings(session, args.batch_size).values()):
+                version = session.run(BUMP_DATA_VERSION_QUERY).single()["version"]
+                print(f"✓ Data version bumped to {version}")
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,109 @@
-from typing import Dict, List, Optional
-from src.setup_database import DatabaseSetup
-from neo4j.graph import Record
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+from src.repository import ProfileRepository
+from src.slow_query_log import slow_query_log
+
+if TYPE_CHECKING:
+    from neo4j.graph import Record
+    from src.setup_database import DatabaseSetup
+
+# Matching queries, shared with the API. LIMIT is applied in Cypher so only
+# the top matches ever leave the database.
+ONE_HOP_QUERY = """
+    MATCH (d:Demand {id: $demand_id})-[:REQUIRES]->(r:Role)<-[:CAN_PLAY]-(p:Person)
+    WITH d, p,
+        gds.similarity.cosine(
+            d.embedding,
+            p.embedding
+        ) AS similarity
+    WHERE similarity > $threshold
+    RETURN p.emp_id AS emp_id, p.name AS name, p.role AS role, p.grade AS grade, similarity
+    ORDER BY similarity DESC
+    LIMIT $limit
+"""
+
+TWO_HOP_QUERY = """
+    MATCH (d:Demand {id: $demand_id})-[:REQUIRES]->(r:Role)<-[:CAN_PLAY]-(p1:Person)-[s:SIMILAR_TO]->(p2:Person)
+    WHERE p1 <> p2 AND s.score > $person_threshold
+    WITH DISTINCT d, p2
+    WITH d, p2,
+        gds.similarity.cosine(
+            d.embedding,
+            p2.embedding
+        ) AS similarity
+    WHERE similarity > $threshold
+    RETURN p2.emp_id AS emp_id, p2.name AS name, p2.role AS role, p2.grade AS grade, similarity
+    ORDER BY similarity DESC
+    LIMIT $limit
+"""
 
 class DemandQuery:
-    def __init__(self, db: DatabaseSetup):
-        """Initialize DemandQuery with database connection."""
+    def __init__(self, db: "DatabaseSetup"):
+        """
+        Initialize DemandQuery with database connection. A ``ProfileRepository``
+        (e.g. a ``MemoryGraph``) may be passed instead to match without Neo4j.
+        """
         self.db = db
 
-    def find_one_hop_connections(self, demand_id: str, similarity_threshold: float = 0.5) -> List[Record]:
+    def find_one_hop_connections(self, demand_id: str, similarity_threshold: float = 0.5,
+                                 limit: int = 50, timeout: Optional[float] = None) -> "List[Record]":
         """
         Find direct connections through roles with similarity above threshold.
-        
+
         Args:
             demand_id: The ID of the demand to search for
             similarity_threshold: Minimum similarity score threshold (default: 0.5)
-            
+            limit: Maximum number of persons to return (default: 50)
+            timeout: Transaction timeout in seconds; the server aborts the query after it
+
         Returns:
-            List of neo4j.Record objects containing matching persons
-        """
-        query = """
-            MATCH (d:Demand {id: $demand_id})-[:REQUIRES]->(r:Role)<-[:CAN_PLAY]-(p:Person)
-            WITH d, p, 
-                gds.similarity.cosine(
-                    d.embedding,
-                    p.embedding
-                ) AS similarity
-            WHERE similarity > $threshold
-            RETURN p.name AS name, p.role AS role, p.grade AS grade, similarity
-            ORDER BY similarity DESC
+            List of neo4j.Record objects (dicts from a repository) containing matching persons
         """
-        
-        with self.db.driver.session() as session:
-            results = list(session.run(query, demand_id=demand_id, threshold=similarity_threshold))
-        return results
+        if isinstance(self.db, ProfileRepository):
+            return self.db.find_demand_matches(demand_id, 1, limit, similarity_threshold, timeout=timeout)
+        params = {"demand_id": demand_id, "threshold": similarity_threshold, "limit": limit}
+        return self._run("demand_matches_1_hop", ONE_HOP_QUERY, params, timeout)
 
-    def find_two_hop_connections(self, demand_id: str, similarity_threshold: float = 0.5, 
-                               person_similarity_threshold: float = 0.3) -> List[Record]:
+    def find_two_hop_connections(self, demand_id: str, similarity_threshold: float = 0.5,
+                               person_similarity_threshold: float = 0.3,
+                               limit: int = 50, timeout: Optional[float] = None) -> "List[Record]":
         """
         Find connections through roles and similar people with similarity above threshold.
-        
+
         Args:
             demand_id: The ID of the demand to search for
             similarity_threshold: Minimum similarity score threshold (default: 0.5)
             person_similarity_threshold: Minimum similarity score between persons (default: 0.3)
-            
+            limit: Maximum number of persons to return (default: 50)
+            timeout: Transaction timeout in seconds; the server aborts the query after it
+
         Returns:
-            List of neo4j.Record objects containing matching persons
-        """
-        query = """
-            MATCH (d:Demand {id: $demand_id})-[:REQUIRES]->(r:Role)<-[:CAN_PLAY]-(p1:Person)-[s:SIMILAR_TO]->(p2:Person)
-            WHERE p1 <> p2 AND s.score > $person_threshold
-            WITH d, p2,
-                gds.similarity.cosine(
-                    d.embedding,
-                    p2.embedding
-                ) AS similarity
-            WHERE similarity > $threshold
-            RETURN DISTINCT p2.name AS name, p2.role AS role, p2.grade AS grade, similarity
-            ORDER BY similarity DESC
+            List of neo4j.Record objects (dicts from a repository) containing matching persons
         """
-        
+        if isinstance(self.db, ProfileRepository):
+            return self.db.find_demand_matches(demand_id, 2, limit, similarity_threshold,
+                                               person_similarity_threshold, timeout=timeout)
+        params = {"demand_id": demand_id, "threshold": similarity_threshold,
+                  "person_threshold": person_similarity_threshold, "limit": limit}
+        return self._run("demand_matches_2_hop", TWO_HOP_QUERY, params, timeout)
+
+    def _run(self, name: str, query: str, params: Dict, timeout: Optional[float]) -> "List[Record]":
+        """Run a matching query, reporting it to the slow-query log if it overran."""
+        # Imported here so matching against a MemoryGraph works without the driver
+        from neo4j import Query
+
+        started = time.perf_counter()
         with self.db.driver.session() as session:
-            results = list(session.run(query, 
-                                    demand_id=demand_id, 
-                                    threshold=similarity_threshold,
-                                    person_threshold=person_similarity_threshold))
+            results = list(session.run(Query(query, timeout=timeout), params))
+
+        def profile():
+            with self.db.driver.session() as session:
+                return session.run(Query("PROFILE " + query, timeout=timeout), params).consume()
+
+        slow_query_log.check(name, query, params, time.perf_counter() - started, len(results), profile=profile)
         return results
 
-    def print_results(self, results: List[Record], hop_type: str):
+    def print_results(self, results: "List[Record]", hop_type: str):
         """Print formatted results."""
         print(f"\n=== {hop_type}-Hop Connections ===")
         if results:
@@ -79,9 +115,13 @@ class DemandQuery:
 
 def main():
     """Main function to demonstrate demand querying."""
+    # Imported here so the API can share the queries above without loading
+    # the embedding model
+    from src.setup_database import DatabaseSetup
+
     db = DatabaseSetup()
     demand_query = DemandQuery(db)
-    
+
     # Sample demand data
     sample_demand = {
         'role': 'UX Designer',
@@ -91,14 +131,14 @@ def main():
         'office': 'New York',
         'job_description': 'Looking for a UX Designer with strong skills in Figma, and Photoshop'
     }
-    
+
     # Create demand and get demand_id
     demand_id = db.create_demands_with_embeddings(sample_demand)
-    
+
     # Find and print 1-hop connections
     one_hop_results = demand_query.find_one_hop_connections(demand_id)
     demand_query.print_results(one_hop_results, "1")
-    
+
     # Find and print 2-hop connections
     two_hop_results = demand_query.find_two_hop_connections(demand_id)
     demand_query.print_results(two_hop_results, "2")
@@ -0,0 +1,105 @@
+"""
+Storage interface for the operations the API and DemandQuery need.
+
+Two backends implement it:
+- ``api.database.ProfileQueries``: Cypher over Bolt (``Neo4jConnection`` and
+  ``AsyncNeo4jConnection``, whose methods return awaitables)
+- ``src.memory_graph.MemoryGraph``: an in-process graph with adjacency indexes
+  and NumPy vector search, for tests, load tests and as a cache tier
+
+Rows are plain dicts shaped like the Cypher projections in api/database.py:
+profiles have emp_id, name, role, grade, office and description; list methods
+take ``limit``, ``after`` (the decoded keyset cursor) and ``fields``.
+"""
+
+from abc import ABC, abstractmethod
+
+# Profile properties returned by every backend; list endpoints can project them with ``fields``
+PROFILE_PROPERTIES = ("emp_id", "name", "role", "grade", "office", "description")
+
+class ProfileRepository(ABC):
+    """Operations on profiles, roles, tools and demands."""
+
+    @abstractmethod
+    def test_connection(self):
+        """Return a message if the store is reachable."""
+
+    @abstractmethod
+    def get_data_version(self):
+        """Return ``{"version", "updated_at"}`` of the graph data version."""
+
+    @abstractmethod
+    def sync_id_sequence(self, name):
+        """Move an ID sequence ("emp_id" or "demand_id") past the highest ID in use."""
+
+    @abstractmethod
+    def create_profile(self, profile_data):
+        """Create a profile linked to its role; includes the bumped data version."""
+
+    @abstractmethod
+    def create_profiles(self, rows):
+        """Create a batch of profiles; returns ``emp_ids`` and the data version."""
+
+    @abstractmethod
+    def search_profiles(self, query, limit=50):
+        """Profiles matching every term of ``query``, most relevant first."""
+
+    @abstractmethod
+    def semantic_search_profiles(self, embedding, k=10):
+        """The ``k`` profiles nearest to ``embedding``, with a ``score``."""
+
+    @abstractmethod
+    def create_demand(self, demand, description, embedding):
+        """Create a demand linked to the role it requires."""
+
+    @abstractmethod
+    def get_demand(self, id):
+        """A demand by ID, or None."""
+
+    @abstractmethod
+    def find_demand_matches(self, demand_id, hops=1, k=10, threshold=0.5, person_threshold=0.3, timeout=None):
+        """The top ``k`` people for a demand, one or two hops from its role."""
+
+    @abstractmethod
+    def get_profile_by_id(self, id):
+        """A profile with its roles and skills, or None."""
+
+    @abstractmethod
+    def get_profiles_by_ids(self, ids):
+        """Profiles with roles and skills, in the order of ``ids``."""
+
+    @abstractmethod
+    def get_snapshot_profiles(self):
+        """Every profile with roles and skills, ordered by emp_id."""
+
+    @abstractmethod
+    def get_all_roles(self):
+        """Every role name, sorted."""
+
+    @abstractmethod
+    def get_all_tools(self):
+        """Every tool name, sorted."""
+
+    @abstractmethod
+    def get_all_profiles(self, limit=None, after=None, fields=None):
+        """One page of profiles ordered by emp_id."""
+
+    @abstractmethod
+    def stream_all_profiles(self, limit=None, after=None, fields=None):
+        """Like ``get_all_profiles``, but yields profiles as they arrive."""
+
+    @abstractmethod
+    def get_profiles_by_role(self, role, limit=None, after=None, fields=None):
+        """One page of the profiles that can play ``role``, ordered by emp_id."""
+
+    @abstractmethod
+    def stream_profiles_by_role(self, role, limit=None, after=None, fields=None):
+        """Like ``get_profiles_by_role``, but yields profiles as they arrive."""
+
+    @abstractmethod
+    def get_profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        """One page of the profiles skilled in ``tool`` with their ``rating``, best rated first."""
+
+    @abstractmethod
+    def stream_profiles_by_tool(self, tool, limit=None, after=None, fields=None):
+        """Like ``get_profiles_by_tool``, but yields profiles as they arrive."""
@@ -38,6 +38,14 @@ SCHEMA_QUERIES = [
     CREATE CONSTRAINT demand_id IF NOT EXISTS
     FOR (d:Demand) REQUIRE d.id IS UNIQUE
     """,
+    """
+    CREATE CONSTRAINT sequence_name IF NOT EXISTS
+    FOR (s:Sequence) REQUIRE s.name IS UNIQUE
+    """,
+    """
+    CREATE CONSTRAINT data_version_name IF NOT EXISTS
+    FOR (v:DataVersion) REQUIRE v.name IS UNIQUE
+    """,
     
     # Indexes for better query performance
     """
@@ -59,9 +67,270 @@ SCHEMA_QUERIES = [
     """
     CREATE INDEX demand_embedding IF NOT EXISTS
     FOR (d:Demand) ON (d.embedding)
+    """,
+    # Vector index backing semantic profile search (queried by the API);
+    # 384 dimensions matches the all-MiniLM-L6-v2 embedding model
+    """
+    CREATE VECTOR INDEX person_embedding_vector IF NOT EXISTS
+    FOR (p:Person) ON (p.embedding)
+    OPTIONS {indexConfig: {
+        `vector.dimensions`: 384,
+        `vector.similarity_function`: 'cosine'
+    }}
+    """,
+    # Full-text index backing profile search (queried by the API)
+    """
+    CREATE FULLTEXT INDEX person_search IF NOT EXISTS
+    FOR (p:Person) ON EACH [p.name, p.role, p.description]
     """
 ]
 
+# Bump the graph data version after a write so API clients stop
+# revalidating their cached responses against stale ETags
+BUMP_DATA_VERSION_QUERY = """
+MERGE (v:DataVersion {name: 'graph'})
+SET v.version = coalesce(v.version, 0) + 1,
+    v.updated_at = timestamp()
+RETURN v.version AS version
+"""
+
+# ID sequences. A (:Sequence {name, value}) node holds the last ID handed out;
+# incrementing it with SET takes a write lock on the node, so concurrent
+# writers never get the same ID and no insert needs to scan existing nodes.
+RESERVE_IDS_QUERY = """
+MERGE (s:Sequence {name: $name})
+ON CREATE SET s.value = 0
+SET s.value = s.value + $count
+RETURN s.value - $count + 1 AS first_id
+"""
+
+# Move each sequence past the highest numeric ID already in the graph.
+# Run after bulk loads that assign their own IDs.
+SYNC_SEQUENCE_QUERIES = {
+    'emp_id': """
+    OPTIONAL MATCH (p:Person)
+    WITH coalesce(max(toInteger(p.emp_id)), 0) AS current
+    MERGE (s:Sequence {name: 'emp_id'})
+    SET s.value = CASE WHEN coalesce(s.value, 0) < current THEN current ELSE s.value END
+    RETURN s.value AS value
+    """,
+    'demand_id': """
+    OPTIONAL MATCH (d:Demand)
+    WITH coalesce(max(toInteger(d.id)), 0) AS current
+    MERGE (s:Sequence {name: 'demand_id'})
+    SET s.value = CASE WHEN coalesce(s.value, 0) < current THEN current ELSE s.value END
+    RETURN s.value AS value
+    """
+}
+
+# Wipe the data before a full reload. The DataVersion and Sequence nodes are
+# kept so the version keeps increasing (running APIs only treat a higher
+# version as new data) and IDs handed out before are never reused.
+CLEAR_DATA_QUERY = """
+MATCH (n)
+WHERE NOT n:DataVersion AND NOT n:Sequence
+DETACH DELETE n
+"""
+
+# Embeddings are stored as float32 arrays, the vector index's native type and
+# half the size of a list of Cypher floats (64-bit). Every write goes through
+# db.create.setNodeVectorProperty, which validates and converts the list; a NULL
+# embedding leaves the property unset.
+def set_embedding(node, row):
+    """Cypher subquery that stores ``row.embedding`` as the float32 ``embedding`` of ``node``."""
+    return f"""CALL {{
+    WITH {node}, {row}
+    WITH {node}, {row} WHERE {row}.embedding IS NOT NULL
+    CALL db.create.setNodeVectorProperty({node}, 'embedding', {row}.embedding)
+}}"""
+
+# Bulk seeding. Each query writes one batch of $rows in a single transaction
+# (see src/bulk_write.py); relationships are created once their nodes exist.
+CREATE_ROLES_QUERY = """
+UNWIND $rows AS name
+CREATE (:Role {name: name})
+"""
+
+CREATE_TOOLS_QUERY = """
+UNWIND $rows AS name
+CREATE (:Tool {name: name})
+"""
+
+CREATE_PERSONS_QUERY = f"""
+UNWIND $rows AS row
+CREATE (p:Person {{
+    emp_id: row.emp_id,
+    name: row.name,
+    role: row.role,
+    grade: row.grade,
+    office: row.office,
+    description: row.description,
+    description_hash: row.description_hash
+}})
+WITH p, row
+{set_embedding('p', 'row')}
+"""
+
+CREATE_CAN_PLAY_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {emp_id: row.emp_id})
+MATCH (r:Role {name: row.role})
+CREATE (p)-[:CAN_PLAY]->(r)
+"""
+
+CREATE_HAS_SKILL_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {emp_id: row.emp_id})
+MATCH (t:Tool {name: row.tool})
+CREATE (p)-[:HAS_SKILL {rating: row.rating}]->(t)
+"""
+
+# Incremental sync (see src/graph_sync.py). The current state of every person
+# is read once, diffed against the source data, and only the deltas are written.
+PERSON_STATE_QUERY = """
+MATCH (p:Person)
+RETURN p.emp_id AS emp_id,
+       p.name AS name,
+       p.role AS role,
+       p.grade AS grade,
+       p.office AS office,
+       p.description_hash AS description_hash,
+       p.embedding IS NOT NULL AND NOT p.embedding IS :: STRING AS has_embedding,
+       [(p)-[:CAN_PLAY]->(r:Role) | r.name] AS roles,
+       [(p)-[s:HAS_SKILL]->(t:Tool) | {tool: t.name, rating: s.rating}] AS skills
+"""
+
+MERGE_ROLES_QUERY = """
+UNWIND $rows AS name
+MERGE (:Role {name: name})
+"""
+
+MERGE_TOOLS_QUERY = """
+UNWIND $rows AS name
+MERGE (:Tool {name: name})
+"""
+
+# Rows carry only the properties that changed, and an embedding if it did
+UPSERT_PERSONS_QUERY = f"""
+UNWIND $rows AS row
+MERGE (p:Person {{emp_id: row.emp_id}})
+SET p += row.properties
+WITH p, row
+{set_embedding('p', 'row')}
+"""
+
+DELETE_PERSONS_QUERY = """
+UNWIND $rows AS emp_id
+MATCH (p:Person {emp_id: emp_id})
+DETACH DELETE p
+"""
+
+MERGE_CAN_PLAY_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {emp_id: row.emp_id})
+MATCH (r:Role {name: row.role})
+MERGE (p)-[:CAN_PLAY]->(r)
+"""
+
+DELETE_CAN_PLAY_QUERY = """
+UNWIND $rows AS row
+MATCH (:Person {emp_id: row.emp_id})-[c:CAN_PLAY]->(:Role {name: row.role})
+DELETE c
+"""
+
+MERGE_HAS_SKILL_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {emp_id: row.emp_id})
+MATCH (t:Tool {name: row.tool})
+MERGE (p)-[s:HAS_SKILL]->(t)
+SET s.rating = row.rating
+"""
+
+DELETE_HAS_SKILL_QUERY = """
+UNWIND $rows AS row
+MATCH (:Person {emp_id: row.emp_id})-[s:HAS_SKILL]->(:Tool {name: row.tool})
+DELETE s
+"""
+
+DEMAND_HASHES_QUERY = """
+MATCH (d:Demand)
+WHERE d.id IN $ids
+RETURN d.id AS id, d.description_hash AS description_hash
+"""
+
+# Demands are never deleted by a sync: most of them are created through the API
+UPSERT_DEMANDS_QUERY = f"""
+UNWIND $rows AS row
+MERGE (d:Demand {{id: row.id}})
+SET d += row.properties
+WITH d, row
+{set_embedding('d', 'row')}
+WITH d, row
+OPTIONAL MATCH (d)-[old:REQUIRES]->(r:Role)
+WHERE r.name <> row.properties.role
+DELETE old
+WITH DISTINCT d, row
+MATCH (r:Role {{name: row.properties.role}})
+MERGE (d)-[:REQUIRES]->(r)
+"""
+
+# Roles and tools that left the source data and nothing refers to any more
+PRUNE_ROLES_QUERY = """
+MATCH (r:Role)
+WHERE NOT r.name IN $names AND NOT (r)--()
+DELETE r
+RETURN count(*) AS deleted
+"""
+
+PRUNE_TOOLS_QUERY = """
+MATCH (t:Tool)
+WHERE NOT t.name IN $names AND NOT (t)--()
+DELETE t
+RETURN count(*) AS deleted
+"""
+
+# Similarity edges of re-embedded people: drop them all first, then recompute
+# each pair once ($changed holds every re-embedded emp_id, $rows one batch)
+DELETE_SIMILAR_TO_QUERY = """
+UNWIND $rows AS emp_id
+MATCH (:Person {emp_id: emp_id})-[s:SIMILAR_TO]-()
+DELETE s
+"""
+
+CREATE_SIMILAR_TO_QUERY = """
+UNWIND $rows AS emp_id
+MATCH (p1:Person {emp_id: emp_id}), (p2:Person)
+WHERE p2.emp_id <> p1.emp_id AND NOT (p2.emp_id IN $changed AND p2.emp_id < p1.emp_id)
+WITH p1, p2, gds.similarity.cosine(p1.embedding, p2.embedding) AS similarity
+WHERE similarity > 0.8
+WITH CASE WHEN p1.emp_id < p2.emp_id THEN [p1, p2] ELSE [p2, p1] END AS pair, similarity
+WITH pair[0] AS a, pair[1] AS b, similarity
+CREATE (a)-[:SIMILAR_TO {score: similarity}]->(b)
+"""
+
+# Rewrite legacy embeddings (comma-joined strings written by older versions of
+# api/setup_database.py) as float32 arrays in place. Only string embeddings match
+# (NOT NULL, as a bare type predicate also accepts null), so converted nodes and
+# nodes without an embedding drop out and a re-run finds nothing; lists of floats
+# are left alone, as the vector index already reads them. Nodes are visited in key order,
+# $batch_size per transaction, resuming after $after.
+def _migrate_embeddings_query(label, key):
+    return f"""
+MATCH (n:{label})
+WHERE n.{key} > $after AND n.embedding IS :: STRING NOT NULL
+WITH n ORDER BY n.{key} LIMIT $batch_size
+WITH n, [x IN split(n.embedding, ',') WHERE trim(x) <> '' | toFloat(x)] AS vector
+FOREACH (_ IN CASE WHEN size(vector) = 0 THEN [1] ELSE [] END | REMOVE n.embedding)
+WITH n, {{embedding: CASE WHEN size(vector) > 0 THEN vector END}} AS row
+{set_embedding('n', 'row')}
+RETURN count(n) AS migrated, max(n.{key}) AS last_key
+"""
+
+MIGRATE_EMBEDDINGS_QUERIES = {
+    'Person': _migrate_embeddings_query('Person', 'emp_id'),
+    'Demand': _migrate_embeddings_query('Demand', 'id'),
+}
+
 # Example of the graph structure in Cypher
 EXAMPLE_STRUCTURE = """
 // Create a Person node
@@ -71,7 +340,7 @@ CREATE (p:Person {
     role: 'string',        // Current role
     grade: 'string',       // Seniority level
     office: 'string',      // Location
-    embedding: 'list'      // Vector embedding of skills and roles
+    embedding: 'float[]'   // float32 vector embedding of skills and roles
 })
 
 // Create a Role node
@@ -93,7 +362,7 @@ CREATE (d:Demand {
     end_date: 'string',    // Project end date
     office: 'string',      // Location
     job_description: 'string', // Text description
-    embedding: 'list'      // Vector embedding of requirements
+    embedding: 'float[]'   // float32 vector embedding of requirements
 })
 
 // Create relationships
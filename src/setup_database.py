@@ -2,21 +2,38 @@
 Combined script to generate descriptions, create embeddings, and populate the database.
 """
 
+import argparse
 from typing import Dict, Any, List
 from neo4j import GraphDatabase
 from sentence_transformers import SentenceTransformer
 from src.data.sample_data import EMPLOYEES, DEMANDS, ROLES, TOOLS
-from src.schema import SCHEMA_QUERIES
+from src import descriptions
+from src.embedder import embed_batched, EMBEDDING_BATCH_SIZE, EMBEDDING_PROCESSES
+from src.embedding_cache import open_cache
+from src.bulk_write import write_batches, person_rows, can_play_rows, has_skill_rows, SEED_BATCH_SIZE
+from src.schema import SCHEMA_QUERIES, CLEAR_DATA_QUERY, BUMP_DATA_VERSION_QUERY, RESERVE_IDS_QUERY, SYNC_SEQUENCE_QUERIES
+from src.schema import (CREATE_ROLES_QUERY, CREATE_TOOLS_QUERY, CREATE_PERSONS_QUERY,
+                        CREATE_CAN_PLAY_QUERY, CREATE_HAS_SKILL_QUERY, MERGE_ROLES_QUERY, MERGE_TOOLS_QUERY,
+                        PRUNE_ROLES_QUERY, PRUNE_TOOLS_QUERY, UPSERT_DEMANDS_QUERY)
+from src.graph_sync import (read_person_state, plan_person_sync, apply_person_sync,
+                            refresh_similarities, changed_demands, merge_names)
 
 class DatabaseSetup:
     def __init__(self, 
                  uri: str = "bolt://localhost:7687",
                  user: str = "neo4j", 
                  password: str = "password",
-                 model_name: str = 'all-MiniLM-L6-v2'):
+                 model_name: str = 'all-MiniLM-L6-v2',
+                 embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+                 embedding_processes: int = EMBEDDING_PROCESSES,
+                 write_batch_size: int = SEED_BATCH_SIZE):
         """Initialize database and embedding model connections."""
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
         self.model = SentenceTransformer(model_name)
+        self.embedding_cache = open_cache(model_name)
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_processes = embedding_processes
+        self.write_batch_size = write_batch_size
 
     def close(self):
         """Close the database connection."""
@@ -24,31 +41,26 @@ class DatabaseSetup:
 
     def format_tools_description(self, tools: Dict[str, int]) -> str:
         """Format tools and their ratings into a readable string."""
-        tools_list = [f"{tool} (rating: {rating})" for tool, rating in tools.items()]
-        return f"Skilled in {', '.join(tools_list)}."
+        return descriptions.format_tools_description(tools)
 
     def generate_profile_description(self, profile: Dict[str, Any]) -> str:
         """Generate a textual description for an employee profile."""
-        roles = ", ".join(profile['can_play'])
-        tools = self.format_tools_description(profile['tools'])
-        
-        description = f"Can play roles: {roles}. {tools}"
-        description += f" {profile['grade']} level position in {profile['office']}."
-        
-        return description
+        return descriptions.generate_profile_description(profile)
 
     def generate_demand_description(self, demand: Dict[str, Any]) -> str:
         """Generate a textual description for a job demand."""
-        description = demand['job_description']
-        additional_info = (
-            f" Position is for a {demand['grade']} {demand['role']} "
-            f"in {demand['office']}, from {demand['start_date']} to {demand['end_date']}."
-        )
-        return f"{description}{additional_info}"
+        return descriptions.generate_demand_description(demand)
 
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for a given text."""
-        return self.model.encode(text).tolist()
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts in batches, reusing cached ones."""
+        encode = lambda batch: embed_batched(self.model, batch, self.embedding_batch_size, self.embedding_processes)
+        if self.embedding_cache is None:
+            return encode(texts)
+        return self.embedding_cache.embed(texts, encode)
 
     def setup_schema(self):
         """Create constraints and indexes"""
@@ -58,70 +70,37 @@ class DatabaseSetup:
             print("✓ Schema setup complete")
 
     def clear_database(self):
-        """Remove all nodes and relationships"""
+        """Remove all nodes and relationships except the data version and ID sequences"""
         with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+            session.run(CLEAR_DATA_QUERY)
             print("✓ Database cleared")
 
     def create_roles(self):
         """Create Role nodes"""
         with self.driver.session() as session:
-            for role in ROLES:
-                session.run(
-                    "CREATE (r:Role {name: $name})",
-                    name=role
-                )
+            write_batches(session, CREATE_ROLES_QUERY, ROLES, self.write_batch_size)
             print("✓ Roles created")
 
     def create_tools(self):
         """Create Tool nodes"""
         with self.driver.session() as session:
-            for tool in TOOLS:
-                session.run(
-                    "CREATE (t:Tool {name: $name})",
-                    name=tool
-                )
+            write_batches(session, CREATE_TOOLS_QUERY, TOOLS, self.write_batch_size)
             print("✓ Tools created")
 
     def create_employees_with_embeddings(self):
         """Create Person nodes with embeddings and their relationships"""
-        with self.driver.session() as session:
-            # First pass: Create all employee nodes
-            for emp in EMPLOYEES.values():
-                # Generate description and embedding
-                description = self.generate_profile_description(emp)
-                embedding = self.generate_embedding(description)
-                
-                # Create Person node with embedding
-                session.run("""
-                    CREATE (p:Person {
-                        emp_id: $emp_id,
-                        name: $name,
-                        role: $role,
-                        grade: $grade,
-                        office: $office,
-                        description: $description,
-                        embedding: $embedding
-                    })
-                """, **emp, description=description, embedding=embedding)
+        # Describe every employee first so the model embeds them in batches
+        employees = list(EMPLOYEES.values())
+        profile_descriptions = [self.generate_profile_description(emp) for emp in employees]
+        embeddings = self.generate_embeddings(profile_descriptions)
 
-                # Create relationships with roles and tools
-                for role in emp['can_play']:
-                    session.run("""
-                        MATCH (p:Person {emp_id: $emp_id})
-                        MATCH (r:Role {name: $role})
-                        CREATE (p)-[:CAN_PLAY]->(r)
-                    """, emp_id=emp['emp_id'], role=role)
+        with self.driver.session() as session:
+            # First pass: Create all employee nodes, then their roles and tools
+            write_batches(session, CREATE_PERSONS_QUERY,
+                          person_rows(employees, profile_descriptions, embeddings), self.write_batch_size)
+            write_batches(session, CREATE_CAN_PLAY_QUERY, can_play_rows(employees), self.write_batch_size)
+            write_batches(session, CREATE_HAS_SKILL_QUERY, has_skill_rows(employees), self.write_batch_size)
 
-                for tool, rating in emp['tools'].items():
-                    session.run("""
-                        MATCH (p:Person {emp_id: $emp_id})
-                        MATCH (t:Tool {name: $tool})
-                        CREATE (p)-[:HAS_SKILL {rating: $rating}]->(t)
-                    """, emp_id=emp['emp_id'], tool=tool, rating=rating)
-                
-                print(f"✓ Created employee {emp['name']} with embedding")
-            
             # Second pass: Create relationships between similar employees
             session.run("""
                 MATCH (p1:Person), (p2:Person)
@@ -138,19 +117,13 @@ class DatabaseSetup:
         """Create Demand nodes with embeddings and their relationships"""
         with self.driver.session() as session:
             if demand and isinstance(demand, dict):
-                # Get the last demand ID and increment
-                last_id_result = session.run("""
-                    MATCH (d:Demand) 
-                    RETURN COALESCE(MAX(toInteger(d.id)), 0) as last_id
-                """)
-                last_id = last_id_result.single()["last_id"]
-                new_id = str(last_id + 1)
-                demand['id'] = new_id
+                # Take the next demand ID from the sequence
+                new_id = session.run(RESERVE_IDS_QUERY, name='demand_id', count=1).single()["first_id"]
+                demand['id'] = str(new_id)
 
                 # Generate description and embedding
                 description = self.generate_demand_description(demand)
                 embedding = self.generate_embedding(description)
-                # embedding_str = ','.join(map(str, embedding))
                 
                 # Create Demand node with embedding
                 session.run("""
@@ -163,9 +136,12 @@ class DatabaseSetup:
                         office: $office,
                         job_description: $job_description,
                         description: $description,
-                        embedding: $embedding
+                        description_hash: $description_hash
                     })
-                """, **demand, description=description, embedding=embedding)
+                    WITH d
+                    CALL db.create.setNodeVectorProperty(d, 'embedding', $embedding)
+                """, **demand, description=description, description_hash=descriptions.description_hash(description),
+                     embedding=embedding)
 
                 # Create REQUIRES relationship
                 session.run("""
@@ -179,12 +155,10 @@ class DatabaseSetup:
                 return demand['id']
                 
             else: 
-                for demand in DEMANDS.values():
-                    # Generate description and embedding
-                    description = self.generate_demand_description(demand)
-                    embedding = self.generate_embedding(description)
-                    # embedding_str = ','.join(map(str, embedding))
-                    
+                demands = list(DEMANDS.values())
+                demand_descriptions = [self.generate_demand_description(demand) for demand in demands]
+                embeddings = self.generate_embeddings(demand_descriptions)
+                for demand, description, embedding in zip(demands, demand_descriptions, embeddings):
                     # Create Demand node with embedding
                     session.run("""
                         CREATE (d:Demand {
@@ -196,9 +170,12 @@ class DatabaseSetup:
                             office: $office,
                             job_description: $job_description,
                             description: $description,
-                            embedding: $embedding
+                            description_hash: $description_hash
                         })
-                    """, **demand, description=description, embedding=embedding)
+                        WITH d
+                        CALL db.create.setNodeVectorProperty(d, 'embedding', $embedding)
+                    """, **demand, description=description, description_hash=descriptions.description_hash(description),
+                         embedding=embedding)
 
                     # Create REQUIRES relationship
                     session.run("""
@@ -211,6 +188,37 @@ class DatabaseSetup:
                 
                 print("✓ Demands created with relationships and embeddings")
 
+    def sync_demands(self):
+        """Create or update sample demands whose description changed; never deletes demands."""
+        demands = list(DEMANDS.values())
+        demand_descriptions = [self.generate_demand_description(demand) for demand in demands]
+        with self.driver.session() as session:
+            changed = changed_demands(session, demands, demand_descriptions)
+            embeddings = self.generate_embeddings([demand_descriptions[i] for i in changed])
+            rows = [
+                {"id": demands[i]["id"],
+                 "properties": {**demands[i], "description": demand_descriptions[i],
+                                "description_hash": descriptions.description_hash(demand_descriptions[i])},
+                 "embedding": embedding or None}
+                for i, embedding in zip(changed, embeddings)
+            ]
+            write_batches(session, UPSERT_DEMANDS_QUERY, rows, self.write_batch_size)
+            print(f"✓ Demands synced: {len(rows)} created or updated")
+        return len(rows)
+
+    def sync_sequences(self):
+        """Move the ID sequences past the IDs assigned by the sample data."""
+        with self.driver.session() as session:
+            for name, query in SYNC_SEQUENCE_QUERIES.items():
+                value = session.run(query).single()["value"]
+                print(f"✓ Sequence {name} at {value}")
+
+    def bump_data_version(self):
+        """Bump the graph data version so the API invalidates cached responses."""
+        with self.driver.session() as session:
+            version = session.run(BUMP_DATA_VERSION_QUERY).single()["version"]
+            print(f"✓ Data version bumped to {version}")
+
     def validate_data(self):
         """Validate that nodes and embeddings were stored correctly."""
         with self.driver.session() as session:
@@ -253,14 +261,63 @@ class DatabaseSetup:
         self.create_tools()
         self.create_employees_with_embeddings()
         self.create_demands_with_embeddings()
+        self.sync_sequences()
+        self.bump_data_version()
         self.validate_data()
+        if self.embedding_cache is not None:
+            stats = self.embedding_cache.stats()
+            print(f"✓ Embedding cache: {stats['hits']} reused, {stats['misses']} embedded, {stats['entries']} stored")
         print("\nDatabase setup completed successfully! ✨")
 
+    def sync_database(self, prune: bool = False):
+        """
+        Bring an existing database in line with the sample data without clearing
+        it; see src/graph_sync.py. With ``prune`` people, roles and tools missing
+        from the sample data are deleted.
+        """
+        print("Starting incremental sync...")
+        self.setup_schema()
+        employees = list(EMPLOYEES.values())
+        profile_descriptions = [self.generate_profile_description(emp) for emp in employees]
+
+        with self.driver.session() as session:
+            # Role and tool nodes created or pruned also change what the API serves
+            names_changed = (merge_names(session, MERGE_ROLES_QUERY, ROLES)
+                             + merge_names(session, MERGE_TOOLS_QUERY, TOOLS))
+            plan = plan_person_sync(employees, profile_descriptions, read_person_state(session), prune)
+            embeddings = self.generate_embeddings([description for _, description in plan.to_embed])
+            apply_person_sync(session, plan, embeddings, self.write_batch_size)
+            refresh_similarities(session, [emp_id for emp_id, _ in plan.to_embed], self.write_batch_size)
+            print(f"✓ People synced: {plan.summary()}")
+            if prune:
+                roles = session.run(PRUNE_ROLES_QUERY, names=ROLES).single()["deleted"]
+                tools = session.run(PRUNE_TOOLS_QUERY, names=TOOLS).single()["deleted"]
+                print(f"✓ Pruned {roles} roles and {tools} tools")
+                names_changed += roles + tools
+
+        demands_changed = self.sync_demands()
+        self.sync_sequences()
+        if plan.empty and not demands_changed and not names_changed:
+            print("✓ Graph already up to date")
+        else:
+            self.bump_data_version()
+        self.validate_data()
+        print("\nDatabase sync completed successfully! ✨")
+
 def main():
     """Main function to setup the database"""
+    parser = argparse.ArgumentParser(description="Load the sample data into Neo4j")
+    parser.add_argument("--sync", action="store_true",
+                        help="apply only the changes to an existing graph instead of wiping and reloading it")
+    parser.add_argument("--prune", action="store_true",
+                        help="with --sync, also delete people, roles and tools missing from the sample data")
+    args = parser.parse_args()
     setup = DatabaseSetup()
     try:
-        setup.setup_database()
+        if args.sync:
+            setup.sync_database(prune=args.prune)
+        else:
+            setup.setup_database()
     finally:
         setup.close()
 
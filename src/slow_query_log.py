@@ -0,0 +1,176 @@
+"""
+Slow-query log with automatic PROFILE capture.
+
+Queries that take longer than a threshold are written, with their (abridged)
+parameters, to a rotating JSON-lines log. Read queries are then re-run once in
+the background under ``PROFILE`` and the db hits and plan operator tree are
+logged too, so plan regressions (label scans, cartesian products) can be
+diagnosed from the log alone. Writes are never re-run.
+
+Settings come from the environment:
+- SLOW_QUERY_THRESHOLD_MS: log queries slower than this (0 disables the log)
+- SLOW_QUERY_LOG_PATH: log file, rotated at SLOW_QUERY_LOG_MAX_BYTES
+- SLOW_QUERY_LOG_BACKUPS: rotated files to keep
+- SLOW_QUERY_PROFILE_COOLDOWN_SECONDS: minimum time between two PROFILE runs
+  of the same query, so a consistently slow query is not profiled on every call
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+DEFAULT_LOG_PATH = str(Path(__file__).resolve().parent.parent / "logs" / "slow_queries.log")
+
+# Parameter values are abridged so embeddings and bulk rows do not flood the log
+MAX_LOGGED_LIST = 10
+MAX_LOGGED_STRING = 200
+
+def _abridge(value):
+    if isinstance(value, dict):
+        return {key: _abridge(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > MAX_LOGGED_LIST:
+            return f"<list of {len(value)}>"
+        return [_abridge(item) for item in value]
+    if isinstance(value, str) and len(value) > MAX_LOGGED_STRING:
+        return value[:MAX_LOGGED_STRING] + "..."
+    return value
+
+def _plan_tree(profile):
+    """Compact operator tree from ``ResultSummary.profile``."""
+    args = profile.get("args", {})
+    return {
+        "operator": profile.get("operatorType"),
+        "details": args.get("Details"),
+        "db_hits": profile.get("dbHits"),
+        "rows": profile.get("rows"),
+        "children": [_plan_tree(child) for child in profile.get("children", [])],
+    }
+
+def _total_db_hits(profile):
+    return profile.get("dbHits", 0) + sum(_total_db_hits(child) for child in profile.get("children", []))
+
+class SlowQueryLog:
+    """Logs slow queries and profiles them in the background."""
+
+    def __init__(self, threshold_ms=500, path=DEFAULT_LOG_PATH, max_bytes=10 * 1024 * 1024,
+                 backup_count=5, profile_cooldown=300.0):
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.profile_cooldown = profile_cooldown
+        self._logger = None
+        self._executor = None
+        self._tasks = set()
+        self._last_profiled = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            threshold_ms=float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "500")),
+            path=os.environ.get("SLOW_QUERY_LOG_PATH", DEFAULT_LOG_PATH),
+            max_bytes=int(os.environ.get("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backup_count=int(os.environ.get("SLOW_QUERY_LOG_BACKUPS", "5")),
+            profile_cooldown=float(os.environ.get("SLOW_QUERY_PROFILE_COOLDOWN_SECONDS", "300")),
+        )
+
+    @property
+    def enabled(self):
+        return self.threshold_ms > 0
+
+    def _write(self, entry):
+        # The file is only created once there is something to log
+        with self._lock:
+            if self._logger is None:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger(f"staffai.slow_queries.{id(self)}")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self._logger = logger
+        entry = {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), **entry}
+        self._logger.info(json.dumps(entry, default=str))
+
+    def _claim_profile(self, name):
+        """True if ``name`` has not been profiled within the cooldown."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_profiled.get(name)
+            if last is not None and now - last < self.profile_cooldown:
+                return False
+            self._last_profiled[name] = now
+            return True
+
+    def check(self, name, query, params, seconds, rows, profile=None):
+        """
+        Log the query if it took longer than the threshold.
+
+        ``profile`` re-runs the query under PROFILE and returns its result
+        summary; it may be a plain or an async callable and is left out for
+        writes. It runs in the background, never on the caller's time.
+        """
+        duration_ms = seconds * 1000
+        if not self.enabled or duration_ms < self.threshold_ms:
+            return False
+        self._write({
+            "event": "slow_query",
+            "query_name": name,
+            "duration_ms": round(duration_ms, 1),
+            "threshold_ms": self.threshold_ms,
+            "rows": rows,
+            "params": _abridge(params or {}),
+            "query": " ".join(query.split()),
+        })
+        if profile is not None and self._claim_profile(name):
+            if inspect.iscoroutinefunction(profile):
+                task = asyncio.get_running_loop().create_task(self._capture_async(name, profile))
+                # Keep a reference until the task is done so it is not collected
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-profile")
+                self._executor.submit(self._capture, name, profile)
+        return True
+
+    def _log_profile(self, name, summary):
+        if summary.profile is None:
+            return
+        self._write({
+            "event": "profile",
+            "query_name": name,
+            "db_hits": _total_db_hits(summary.profile),
+            "notifications": [notification.get("title") for notification in summary.notifications or []],
+            "plan": _plan_tree(summary.profile),
+        })
+
+    def _log_profile_error(self, name, error):
+        self._write({"event": "profile_error", "query_name": name, "error": str(error)})
+
+    def _capture(self, name, profile):
+        try:
+            self._log_profile(name, profile())
+        except Exception as e:
+            self._log_profile_error(name, e)
+
+    async def _capture_async(self, name, profile):
+        try:
+            self._log_profile(name, await profile())
+        except Exception as e:
+            self._log_profile_error(name, e)
+
+# Shared by the API connections and the query scripts
+slow_query_log = SlowQueryLog.from_env()
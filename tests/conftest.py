@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tests import ``src`` from the repository root, as the API does (see api/config.py)
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, "api")):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from admission import AdmissionControlledConnection, AdmissionQueue, Overloaded
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def settle():
+    """Let the tasks started so far run up to their next wait."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_rejects_when_the_queue_is_full():
+    async def scenario():
+        queue = AdmissionQueue("lookup", limit=1, queue_size=1, queue_timeout=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with queue.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        waiter = asyncio.ensure_future(hold())
+        await settle()
+        assert (queue.active, queue.waiting) == (1, 1)
+        with pytest.raises(Overloaded) as raised:
+            async with queue.slot():
+                pass
+        assert raised.value.status_code == 503
+        assert raised.value.headers["Retry-After"] == "1"
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return queue
+
+    queue = run(scenario())
+    assert (queue.rejected, queue.admitted, queue.active) == (1, 2, 0)
+
+def test_times_out_and_keeps_its_capacity():
+    async def scenario():
+        queue = AdmissionQueue("matching", limit=1, queue_size=4, queue_timeout=0.01)
+        async with queue.slot():
+            for _ in range(3):
+                with pytest.raises(Overloaded):
+                    async with queue.slot():
+                        pass
+        await settle()
+        # Every abandoned acquire handed its permit back: the slot is free again
+        async with queue.slot():
+            pass
+        return queue
+
+    queue = run(scenario())
+    assert queue.timed_out == 3
+    assert queue.waiting == 0
+    assert queue._slots._value == 1
+
+def test_a_permit_granted_as_the_wait_ends_is_released():
+    async def scenario():
+        queue = AdmissionQueue("lookup", limit=1, queue_size=4, queue_timeout=1)
+        await queue._slots.acquire()
+        waiter = asyncio.ensure_future(queue._acquire())
+        await settle()
+        # Grant the permit and cancel the waiter in the same step of the loop
+        queue._slots.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await settle()
+        return queue
+
+    assert run(scenario())._slots._value == 1
+
+class Rows:
+    """A connection whose stream_rows yields a few rows and records that it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def stream_rows(self):
+        try:
+            for row in range(3):
+                yield {"row": row}
+        finally:
+            self.closed = True
+
+def admitted(connection, limit=1):
+    queue = AdmissionQueue("lookup", limit=limit, queue_size=0, queue_timeout=0.01)
+    return AdmissionControlledConnection(connection, {"lookup": queue, "matching": queue}), queue
+
+def test_streams_hold_their_slot_until_exhausted():
+    async def scenario():
+        connection, queue = admitted(Rows())
+        stream = await connection.stream_rows()
+        assert queue.active == 1
+        rows = [row async for row in stream]
+        return rows, queue
+
+    rows, queue = run(scenario())
+    assert rows == [{"row": 0}, {"row": 1}, {"row": 2}]
+    assert queue.active == 0
+
+def test_a_stream_that_is_never_read_releases_its_slot_on_close():
+    async def scenario():
+        source = Rows()
+        connection, queue = admitted(source)
+        stream = await connection.stream_rows()
+        with pytest.raises(Overloaded):
+            await connection.stream_rows()
+        await stream.aclose()
+        await stream.aclose()
+        assert queue.active == 0
+        # The slot is usable again
+        await (await connection.stream_rows()).aclose()
+        return queue
+
+    queue = run(scenario())
+    assert queue._slots._value == 1
+
+def test_closing_a_stream_midway_closes_the_source():
+    async def scenario():
+        source = Rows()
+        connection, queue = admitted(source)
+        stream = await connection.stream_rows()
+        assert await stream.__anext__() == {"row": 0}
+        await stream.aclose()
+        return source, queue
+
+    source, queue = run(scenario())
+    assert source.closed
+    assert queue.active == 0
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.embedding_cache import EmbeddingCache
+
+class Encoder:
+    """Deterministic 3-d embeddings that count how many texts were encoded."""
+
+    def __init__(self, dimension=3):
+        self.dimension = dimension
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return [[float(len(text)), float(i), 1.0][:self.dimension] + [0.5] * (self.dimension - 3)
+                for i, text in enumerate(texts)]
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "embeddings")
+
+def test_misses_are_encoded_once_and_then_hit(directory):
+    cache = EmbeddingCache("model-a", directory)
+    encode = Encoder()
+    first = cache.embed(["alpha", "beta", "alpha"], encode)
+    assert encode.encoded == ["alpha", "beta"]
+    assert first[0] == first[2]
+    assert cache.stats() == {"entries": 2, "hits": 0, "misses": 2}
+
+    second = cache.embed(["beta", "gamma"], encode)
+    assert encode.encoded == ["alpha", "beta", "gamma"]
+    assert second[0] == first[1]
+    assert cache.stats() == {"entries": 3, "hits": 1, "misses": 3}
+
+def test_entries_survive_reopening(directory):
+    EmbeddingCache("model-a", directory).embed(["alpha", "beta"], Encoder())
+    cache = EmbeddingCache("model-a", directory)
+    assert len(cache) == 2
+    assert cache.get("beta") == pytest.approx([4.0, 1.0, 1.0])
+    assert cache.get("delta") is None
+
+def test_models_do_not_share_entries(directory):
+    EmbeddingCache("model-a", directory).embed(["alpha"], Encoder())
+    other = EmbeddingCache("model-b", directory)
+    assert other.get("alpha") is None
+    assert len(EmbeddingCache("model-a", directory)) == 1
+
+def test_a_directory_written_for_another_model_is_discarded(directory):
+    # "org/model" and "org_model" sanitise to the same directory
+    EmbeddingCache("org/model", directory).embed(["alpha"], Encoder())
+    cache = EmbeddingCache("org_model", directory)
+    assert len(cache) == 0
+    cache.embed(["alpha"], Encoder())
+    meta = json.loads((cache.path / "meta.json").read_text())
+    assert meta == {"model": "org_model", "dimension": 3}
+
+def test_a_new_dimension_replaces_the_stored_vectors(directory):
+    cache = EmbeddingCache("model-a", directory)
+    cache.embed(["alpha", "beta"], Encoder(3))
+    vectors = cache.embed(["alpha", "gamma"], lambda texts: Encoder(5)(texts))
+    # "alpha" is a hit at the old dimension, but the write of "gamma" resets the cache
+    assert len(vectors[1]) == 5
+    reopened = EmbeddingCache("model-a", directory)
+    assert reopened.dimension == 5
+    assert reopened.get("alpha") is None
+    assert len(reopened.get("gamma")) == 5
+
+def test_rows_of_an_interrupted_write_are_ignored(directory):
+    cache = EmbeddingCache("model-a", directory)
+    cache.embed(["alpha", "beta"], Encoder())
+    # A vector was appended but its key never written
+    with open(cache.path / "vectors.f32", "ab") as f:
+        f.write(np.ones(3, dtype=np.float32).tobytes())
+    reopened = EmbeddingCache("model-a", directory)
+    assert len(reopened) == 2
+    reopened.embed(["gamma"], Encoder())
+    again = EmbeddingCache("model-a", directory)
+    assert len(again) == 3
+    assert again.get("gamma") == pytest.approx([5.0, 0.0, 1.0])
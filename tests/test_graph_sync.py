@@ -0,0 +1,90 @@
+from src.descriptions import description_hash
+from src.graph_sync import PersonSyncPlan, merge_names, plan_person_sync
+
+def employee(emp_id, role="Developer", grade="Senior", can_play=("Developer",), tools=None):
+    return {"emp_id": emp_id, "name": f"Person {emp_id}", "role": role, "grade": grade, "office": "London",
+            "can_play": list(can_play), "tools": dict(tools or {"Python": 4})}
+
+def stored(emp, description, has_embedding=True):
+    """The read_person_state entry of ``emp`` as last synced."""
+    return {"name": emp["name"], "role": emp["role"], "grade": emp["grade"], "office": emp["office"],
+            "description_hash": description_hash(description), "has_embedding": has_embedding,
+            "roles": set(emp["can_play"]), "tools": dict(emp["tools"])}
+
+def test_unchanged_people_need_no_writes():
+    emp = employee("001")
+    plan = plan_person_sync([emp], ["Python developer"], {"001": stored(emp, "Python developer")})
+    assert plan.empty
+    assert (plan.created, plan.updated, plan.to_embed) == ([], [], [])
+
+def test_new_people_are_created_with_their_relationships():
+    emp = employee("002", can_play=("Developer", "Architect"), tools={"Python": 4, "Go": 3})
+    plan = plan_person_sync([emp], ["Go developer"], {})
+    assert plan.created == ["002"] and plan.updated == []
+    assert plan.properties["002"]["description_hash"] == description_hash("Go developer")
+    assert plan.to_embed == [("002", "Go developer")]
+    assert plan.add_can_play == [{"emp_id": "002", "role": "Architect"}, {"emp_id": "002", "role": "Developer"}]
+    assert {row["tool"] for row in plan.set_has_skill} == {"Python", "Go"}
+
+def test_updates_carry_only_the_changed_properties():
+    before = employee("003")
+    after = employee("003", grade="Lead", can_play=("Architect",), tools={"Python": 5, "Go": 2})
+    plan = plan_person_sync([after], ["same text"], {"003": stored(before, "same text")})
+    assert plan.updated == ["003"]
+    assert plan.properties == {"003": {"grade": "Lead"}}
+    assert plan.to_embed == []
+    assert plan.add_can_play == [{"emp_id": "003", "role": "Architect"}]
+    assert plan.remove_can_play == [{"emp_id": "003", "role": "Developer"}]
+    assert plan.set_has_skill == [{"emp_id": "003", "tool": "Python", "rating": 5},
+                                  {"emp_id": "003", "tool": "Go", "rating": 2}]
+    assert plan.remove_has_skill == []
+
+def test_changed_or_missing_embeddings_are_redone():
+    emp = employee("004")
+    plan = plan_person_sync([emp, employee("005")], ["new text", "old text"],
+                            {"004": stored(emp, "old text"), "005": stored(employee("005"), "old text", False)})
+    assert plan.to_embed == [("004", "new text"), ("005", "old text")]
+    assert plan.properties["004"] == {"description": "new text", "description_hash": description_hash("new text")}
+    rows = plan.upsert_rows([[0.1, 0.2], []])
+    assert rows[0]["embedding"] == [0.1, 0.2]
+    # An empty embedding is written as null, leaving the property unset
+    assert rows[1]["embedding"] is None
+
+def test_people_missing_from_the_source_are_deleted_only_with_prune():
+    kept, gone = employee("006"), employee("007")
+    state = {"006": stored(kept, "text"), "007": stored(gone, "text")}
+    assert plan_person_sync([kept], ["text"], state).deleted == []
+    plan = plan_person_sync([kept], ["text"], state, prune=True)
+    assert plan.deleted == ["007"]
+    assert not plan.empty
+
+def test_removed_skills_are_listed():
+    before = employee("008", tools={"Python": 4, "R": 3})
+    plan = plan_person_sync([employee("008")], ["text"], {"008": stored(before, "text")})
+    assert plan.remove_has_skill == [{"emp_id": "008", "tool": "R"}]
+    assert "1 removed" in plan.summary()
+
+def test_an_empty_plan_has_no_rows():
+    assert PersonSyncPlan().empty
+    assert PersonSyncPlan().upsert_rows([]) == []
+
+class CountingSession:
+    """Answers write transactions with a result whose counters report ``created`` nodes."""
+
+    def __init__(self, created):
+        self.created = created
+        self.runs = []
+
+    def execute_write(self, work):
+        return work(self)
+
+    def run(self, query, **params):
+        self.runs.append(params)
+        counters = type("Counters", (), {"nodes_created": self.created})()
+        summary = type("Summary", (), {"counters": counters})()
+        return type("Result", (), {"consume": lambda self: summary})()
+
+def test_merge_names_reports_created_nodes():
+    session = CountingSession(created=2)
+    assert merge_names(session, "MERGE", ("Developer", "Architect")) == 2
+    assert session.runs == [{"rows": ["Developer", "Architect"]}]
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+
+from src.memory_graph import MemoryGraph
+from src.query.demand_query import DemandQuery
+from src.repository import PROFILE_PROPERTIES, ProfileRepository
+
+def person(emp_id, name, role, description=""):
+    return {"emp_id": emp_id, "name": name, "role": role, "grade": "Senior", "office": "London",
+            "description": description}
+
+@pytest.fixture
+def graph():
+    """Four people in two roles, with embeddings on the unit axes of a 3-d space."""
+    graph = MemoryGraph(clock=lambda: 1000.0)
+    graph.add_person(person("003", "Carol", "Data Engineer", "Builds Spark pipelines"), [0.9, 0.1, 0.0])
+    graph.add_person(person("001", "Alice", "Data Scientist", "Python and machine learning"), [1.0, 0.0, 0.0])
+    graph.add_person(person("002", "Bob", "Data Scientist", "Statistics in R and Python"), [0.0, 1.0, 0.0])
+    graph.add_person(person("004", "Dave", "Designer", "Figma prototypes"), [0.0, 0.0, 1.0])
+    for emp_id, role in [("001", "Data Scientist"), ("002", "Data Scientist"),
+                         ("003", "Data Engineer"), ("004", "Designer")]:
+        graph.add_can_play(emp_id, role)
+    for emp_id, tool, rating in [("001", "Python", 5), ("002", "Python", 4), ("003", "Python", 4),
+                                 ("002", "R", 5), ("004", "Figma", 5)]:
+        graph.add_skill(emp_id, tool, rating)
+    graph.build_similarities()
+    return graph
+
+def emp_ids(rows):
+    return [row["emp_id"] for row in rows]
+
+def test_profiles_are_listed_and_paged_by_emp_id(graph):
+    assert emp_ids(graph.get_all_profiles()) == ["001", "002", "003", "004"]
+    assert emp_ids(graph.get_all_profiles(limit=2)) == ["001", "002"]
+    assert emp_ids(graph.get_all_profiles(limit=2, after=("002",))) == ["003", "004"]
+    assert graph.get_all_profiles(after=("004",)) == []
+
+def test_fields_always_include_emp_id(graph):
+    assert graph.get_all_profiles(limit=1, fields={"name"}) == [{"emp_id": "001", "name": "Alice"}]
+    assert set(graph.get_all_profiles(limit=1)[0]) == set(PROFILE_PROPERTIES)
+
+def test_profiles_by_role(graph):
+    assert emp_ids(graph.get_profiles_by_role("Data Scientist")) == ["001", "002"]
+    assert emp_ids(graph.get_profiles_by_role("Data Scientist", limit=1, after=("001",))) == ["002"]
+    assert graph.get_profiles_by_role("Astronaut") == []
+
+def test_profiles_by_tool_page_by_rating_then_emp_id(graph):
+    rows = graph.get_profiles_by_tool("Python")
+    assert [(row["emp_id"], row["rating"]) for row in rows] == [("001", 5), ("002", 4), ("003", 4)]
+    rows = graph.get_profiles_by_tool("Python", limit=1, after=(4, "002"))
+    assert emp_ids(rows) == ["003"]
+
+def test_profile_detail(graph):
+    detail = graph.get_profile_by_id("002")
+    assert detail["roles"] == ["Data Scientist"]
+    assert detail["skills"] == [{"name": "Python", "rating": 4}, {"name": "R", "rating": 5}]
+    assert graph.get_profile_by_id("999") is None
+    assert emp_ids(graph.get_profiles_by_ids(["004", "999", "001"])) == ["004", "001"]
+
+def test_roles_and_tools_are_sorted(graph):
+    assert graph.get_all_roles() == ["Data Engineer", "Data Scientist", "Designer"]
+    assert graph.get_all_tools() == ["Figma", "Python", "R"]
+
+def test_search_requires_every_term_and_ranks_exact_matches_first(graph):
+    assert emp_ids(graph.search_profiles("python")) == ["001", "002"]
+    assert emp_ids(graph.search_profiles("data")) == ["001", "002", "003"]
+    # "statistic" only prefixes Bob's word; "data" matches both exactly
+    assert emp_ids(graph.search_profiles("data statistic")) == ["002"]
+    assert emp_ids(graph.search_profiles("pyth")) == ["001", "002"]
+    assert emp_ids(graph.search_profiles("data", limit=1)) == ["001"]
+    assert graph.search_profiles("python figma") == []
+
+def test_semantic_search_returns_nearest_first(graph):
+    rows = graph.semantic_search_profiles([1.0, 0.05, 0.0], k=2)
+    assert emp_ids(rows) == ["001", "003"]
+    assert rows[0]["score"] == pytest.approx((1 + 1 / np.linalg.norm([1.0, 0.05])) / 2)
+    assert len(graph.semantic_search_profiles([0.0, 0.0, 1.0], k=10)) == 4
+
+def test_similar_people_are_linked_once(graph):
+    assert set(graph._similar) == {"001"}
+    assert list(graph._similar["001"]) == ["003"]
+
+def test_created_profiles_get_the_next_emp_id_and_bump_the_version(graph):
+    graph.sync_id_sequence("emp_id")
+    row = {"role": "Designer", "grade": "Junior", "office": "Paris", "job_description": "UX work",
+           "start_date": "2025-01-01", "end_date": "2025-06-30"}
+    result = graph.create_profiles([row, row])
+    assert result["emp_ids"] == ["005", "006"]
+    assert result["data_version"] == 1
+    assert result["data_updated_at"] == 1000000
+    assert emp_ids(graph.get_profiles_by_role("Designer")) == ["004", "005", "006"]
+    assert emp_ids(graph.search_profiles("ux")) == ["005", "006"]
+
+def test_demand_matches(graph):
+    demand = graph.create_demand({"role": "Data Scientist", "grade": "Senior", "start_date": "2025-01-01",
+                                  "end_date": "2025-06-30", "office": "London", "job_description": "ML"},
+                                 "ML work", [1.0, 0.2, 0.0])
+    assert graph.get_demand(demand["id"])["role"] == "Data Scientist"
+    one_hop = graph.find_demand_matches(demand["id"], hops=1, threshold=0.5)
+    # Bob plays the role but is not similar enough to the demand
+    assert emp_ids(one_hop) == ["001"]
+    assert set(one_hop[0]) == {"emp_id", "name", "role", "grade", "similarity"}
+    # Two hops reach people similar to those who play the role
+    assert emp_ids(graph.find_demand_matches(demand["id"], hops=2, threshold=0.5)) == ["003"]
+    assert graph.find_demand_matches("missing") == []
+
+def test_demand_query_runs_against_a_memory_graph(graph):
+    demand = graph.create_demand({"role": "Data Scientist", "grade": "Senior", "start_date": "2025-01-01",
+                                  "end_date": "2025-06-30", "office": "London", "job_description": "ML"},
+                                 "ML work", [1.0, 0.2, 0.0])
+    query = DemandQuery(graph)
+    assert emp_ids(query.find_one_hop_connections(demand["id"])) == ["001"]
+    assert emp_ids(query.find_one_hop_connections(demand["id"], similarity_threshold=-1)) == ["001", "002"]
+    assert emp_ids(query.find_one_hop_connections(demand["id"], similarity_threshold=-1, limit=1)) == ["001"]
+    assert emp_ids(query.find_two_hop_connections(demand["id"])) == ["003"]
+    assert query.find_two_hop_connections(demand["id"], person_similarity_threshold=0.999) == []
+
+def fake_embed(texts):
+    """Deterministic bag-of-words vectors, so no model is needed."""
+    vectors = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, sum(word.encode()) % 64] += 1
+    return vectors
+
+def test_from_sample_data():
+    from src.data.sample_data import EMPLOYEES, DEMANDS
+
+    graph = MemoryGraph.from_sample_data(fake_embed)
+    assert len(graph.get_all_profiles()) == len(EMPLOYEES)
+    assert graph.get_data_version()["version"] == 1
+    for demand in DEMANDS.values():
+        matches = DemandQuery(graph).find_one_hop_connections(demand["id"], similarity_threshold=0)
+        plays_role = {emp["emp_id"] for emp in EMPLOYEES.values() if demand["role"] in emp["can_play"]}
+        assert matches and set(emp_ids(matches)) <= plays_role
+        assert [match["similarity"] for match in matches] == sorted(
+            (match["similarity"] for match in matches), reverse=True)
+
+def test_repositories_must_implement_the_whole_interface():
+    class Partial(ProfileRepository):
+        def test_connection(self):
+            return "ok"
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial()
+    assert isinstance(MemoryGraph(), ProfileRepository)
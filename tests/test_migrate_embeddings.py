@@ -0,0 +1,36 @@
+from src.migrate_embeddings import migrate_embeddings
+from src.schema import MIGRATE_EMBEDDINGS_QUERIES
+
+class FakeSession:
+    """Answers each migration batch with the next (migrated, last_key) pair of its label."""
+
+    def __init__(self, batches):
+        self.batches = {query: list(batches.get(label, [])) for label, query in MIGRATE_EMBEDDINGS_QUERIES.items()}
+        self.calls = []
+
+    def execute_write(self, work):
+        return work(self)
+
+    def run(self, query, **params):
+        self.calls.append((query, params))
+        pending = self.batches[query]
+        migrated, last_key = pending.pop(0) if pending else (0, None)
+        record = {"migrated": migrated, "last_key": last_key}
+        return type("Result", (), {"single": lambda self: record})()
+
+def test_only_non_null_string_embeddings_are_matched():
+    for query in MIGRATE_EMBEDDINGS_QUERIES.values():
+        # A bare ``IS :: STRING`` is also true for null, i.e. nodes without an embedding
+        assert "n.embedding IS :: STRING NOT NULL" in query
+        assert "IS :: STRING\n" not in query
+
+def test_batches_resume_after_the_last_key():
+    session = FakeSession({"Person": [(2, "002"), (1, "005")], "Demand": [(1, "D001")]})
+    assert migrate_embeddings(session, batch_size=2) == {"Person": 3, "Demand": 1}
+    person = MIGRATE_EMBEDDINGS_QUERIES["Person"]
+    assert [params["after"] for query, params in session.calls if query == person] == ["", "002", "005"]
+
+def test_a_migrated_database_migrates_nothing():
+    session = FakeSession({})
+    assert not any(migrate_embeddings(session).values())
+    assert len(session.calls) == len(MIGRATE_EMBEDDINGS_QUERIES)
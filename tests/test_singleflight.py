@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_concurrent_calls_share_one_load():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await release.wait()
+            return {"rows": 3}
+
+        callers = [asyncio.ensure_future(flight.do(("roles",), load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+        return flight, loads, results
+
+    flight, loads, results = run(scenario())
+    assert len(loads) == 1
+    assert results == [{"rows": 3}] * 5
+    assert flight.stats() == {"in_flight": 0, "namespaces": {"roles": {"calls": 1, "coalesced": 4}}}
+
+def test_different_keys_load_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def load(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(flight.do(("profiles", 1), lambda: load(1)),
+                                    flight.do(("profiles", 2), lambda: load(2)))
+
+    assert run(scenario()) == [1, 2]
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fail():
+            await release.wait()
+            raise RuntimeError("database down")
+
+        callers = [asyncio.ensure_future(flight.do(("tools",), fail)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+
+        async def succeed():
+            return ["Python"]
+
+        return results, await flight.do(("tools",), succeed)
+
+    results, retried = run(scenario())
+    assert [str(result) for result in results] == ["database down"] * 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == ["Python"]
+
+def test_a_cancelled_caller_does_not_cancel_the_load():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do(("roles",), load))
+        second = asyncio.ensure_future(flight.do(("roles",), load))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert run(scenario()) == "done"
+
+def test_forget_starts_a_fresh_load():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await release.wait()
+            return len(loads)
+
+        stale = asyncio.ensure_future(flight.do(("profiles", None), load))
+        await asyncio.sleep(0)
+        flight.forget("profiles")
+        fresh = asyncio.ensure_future(flight.do(("profiles", None), load))
+        await asyncio.sleep(0)
+        release.set()
+        return await stale, await fresh, loads
+
+    stale, fresh, loads = run(scenario())
+    assert len(loads) == 2
+    assert fresh == 2
@@ -0,0 +1,53 @@
+from snapshot import GraphSnapshot
+
+PROFILES = [
+    {"emp_id": "001", "name": "Alice", "role": "Data Scientist", "grade": "Senior", "office": "London",
+     "description": "Python and machine learning", "roles": ["Data Scientist"],
+     "skills": [{"name": "Python", "rating": 5}]},
+    {"emp_id": "002", "name": "Bob", "role": "Designer", "grade": "Junior", "office": "Paris",
+     "description": "Figma prototypes", "roles": ["Designer", "Data Scientist"],
+     "skills": [{"name": "Figma", "rating": 4}, {"name": "Python", "rating": 5}]},
+]
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_empty_until_loaded():
+    snapshot = GraphSnapshot()
+    assert not snapshot.loaded
+    assert snapshot.age is None
+    assert snapshot.all_profiles() == []
+    assert snapshot.stats()["profiles"] == 0
+
+def test_reads_mirror_the_repository():
+    snapshot = GraphSnapshot()
+    snapshot.load(PROFILES, ["Data Scientist", "Designer"], ["Figma", "Python"], version=3)
+    assert [row["emp_id"] for row in snapshot.all_profiles(limit=1, after=("001",))] == ["002"]
+    assert [row["emp_id"] for row in snapshot.profiles_by_role("Data Scientist")] == ["001", "002"]
+    rows = snapshot.profiles_by_tool("Python", limit=1, after=(5, "001"))
+    assert [(row["emp_id"], row["rating"]) for row in rows] == [("002", 5)]
+    assert snapshot.profile_by_id("002")["roles"] == ["Designer", "Data Scientist"]
+    assert [row["emp_id"] for row in snapshot.search("pyth")] == ["001"]
+    assert snapshot.roles == ["Data Scientist", "Designer"]
+    assert snapshot.stats()["profiles"] == 2
+
+def test_load_replaces_the_previous_data():
+    snapshot = GraphSnapshot()
+    snapshot.load(PROFILES, [], [], version=1)
+    snapshot.load(PROFILES[:1], [], [], version=2)
+    assert [row["emp_id"] for row in snapshot.all_profiles()] == ["001"]
+    assert snapshot.profiles_by_role("Designer") == []
+
+def test_confirm_refreshes_the_age_only_at_the_same_version():
+    clock = Clock()
+    snapshot = GraphSnapshot(clock=clock)
+    snapshot.load(PROFILES, [], [], version=1)
+    clock.now += 30
+    assert snapshot.age == 30
+    assert not snapshot.confirm(2)
+    assert snapshot.confirm(1)
+    assert snapshot.age == 0
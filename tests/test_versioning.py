@@ -0,0 +1,37 @@
+from versioning import DataVersion
+
+def version(value=7, updated_at=1_700_000_000_000):
+    data_version = DataVersion()
+    data_version.update(value, updated_at)
+    return data_version
+
+def test_matching_etags_are_not_modified():
+    data_version = version()
+    assert data_version.is_not_modified({"if-none-match": '"v7"'})
+    assert data_version.is_not_modified({"if-none-match": 'W/"v6", W/"v7"'})
+    assert not data_version.is_not_modified({"if-none-match": '"v6"'})
+
+def test_each_representation_has_its_own_etag():
+    data_version = version()
+    assert data_version.headers("ndjson")["ETag"] == '"v7-ndjson"'
+    assert not data_version.is_not_modified({"if-none-match": '"v7"'}, "ndjson")
+    assert data_version.is_not_modified({"if-none-match": '"v7-ndjson"'}, "ndjson")
+
+def test_wildcard_if_none_match_is_ignored():
+    data_version = version()
+    assert not data_version.is_not_modified({"if-none-match": "*"})
+    # If-None-Match takes precedence over If-Modified-Since even when ignored
+    assert not data_version.is_not_modified({"if-none-match": "*",
+                                             "if-modified-since": data_version.last_modified_header})
+
+def test_if_modified_since():
+    data_version = version()
+    assert data_version.is_not_modified({"if-modified-since": data_version.last_modified_header})
+    assert not data_version.is_not_modified({"if-modified-since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert not data_version.is_not_modified({"if-modified-since": "not a date"})
+
+def test_nothing_is_fresh_before_the_version_is_known():
+    assert not DataVersion().is_not_modified({"if-none-match": '"v0"'})
+    data_version = version()
+    assert not data_version.update(6)
+    assert data_version.update(8)